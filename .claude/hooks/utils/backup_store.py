@@ -0,0 +1,488 @@
+#!/usr/bin/env -S uv run --script
+# /// script
+# requires-python = ">=3.8"
+# dependencies = []
+# ///
+"""
+Content-addressed, deduplicated transcript backups for the PreCompact hook.
+
+pre_compact.py used to copy the whole session transcript every time
+compaction fired. A transcript only grows between compactions, so each
+backup was mostly a duplicate of the previous one and disk use grew
+quadratically with session length. This store keeps:
+
+- ``chunks/<xx>/<sha256>.zst`` (or ``.gz``): line-aligned pieces of a
+  transcript, each stored once and compressed. Chunk boundaries are
+  content-defined: they are chosen per line from the line's CRC once a
+  chunk reaches ``MIN_CHUNK``, with ``MAX_CHUNK`` as a hard cap. An
+  appended transcript therefore re-uses every chunk except the tail.
+- ``manifests/<session_id>/<UTC stamp>-<trigger>.json``: one small file per
+  backup listing the chunk hashes, plus the size and SHA-256 of the
+  original, so ``restore`` can rebuild it byte for byte and verify it.
+- ``gc``: removes manifests older than ``max_age`` while always keeping each
+  session's newest ``keep_last``, then deletes chunks no manifest refers to.
+
+zstd is used when the ``zstandard`` package is importable, gzip otherwise.
+The codec is recorded in each chunk's file extension, so stores written
+with either can be read by both.
+
+Usage from a hook:
+
+    from utils.backup_store import backup_transcript
+    backup_transcript(transcript_path, session_id, trigger)
+
+Command line:
+
+    uv run .claude/hooks/utils/backup_store.py backup TRANSCRIPT --session ID [--trigger auto]
+    uv run .claude/hooks/utils/backup_store.py list [--session ID]
+    uv run .claude/hooks/utils/backup_store.py restore MANIFEST OUTPUT
+    uv run .claude/hooks/utils/backup_store.py gc [--max-age-days 30] [--keep-last 1]
+    uv run .claude/hooks/utils/backup_store.py stats
+    uv run .claude/hooks/utils/backup_store.py simulate [--compactions 20]
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import zlib
+from datetime import datetime, timezone
+from pathlib import Path
+
+try:
+    import zstandard
+except ImportError:  # gzip fallback
+    zstandard = None
+
+
+DEFAULT_STORE_DIR = Path("logs") / "transcript_store"
+MIN_CHUNK = 16 * 1024
+MAX_CHUNK = 256 * 1024
+BOUNDARY_MASK = 0x7
+DEFAULT_MAX_AGE = 30 * 24 * 3600
+DEFAULT_KEEP_LAST = 1
+GC_GRACE = 3600
+MANIFEST_VERSION = 1
+
+
+def iter_chunks(f, min_chunk=MIN_CHUNK, max_chunk=MAX_CHUNK):
+    """Split a binary stream into line-aligned chunks.
+
+    A chunk ends after a line once it holds at least ``min_chunk`` bytes
+    and the line's CRC hits ``BOUNDARY_MASK``, or once it reaches
+    ``max_chunk``. Lines are never split, so one very long line becomes
+    its own oversized chunk. A final line without a newline is kept as is.
+    """
+    parts = []
+    size = 0
+    for line in f:
+        parts.append(line)
+        size += len(line)
+        if size >= max_chunk or (
+            size >= min_chunk and zlib.crc32(line) & BOUNDARY_MASK == 0
+        ):
+            yield b"".join(parts)
+            parts, size = [], 0
+    if parts:
+        yield b"".join(parts)
+
+
+def _compress(data):
+    if zstandard is not None:
+        return zstandard.ZstdCompressor(level=3).compress(data), ".zst"
+    return gzip.compress(data, compresslevel=6, mtime=0), ".gz"
+
+
+def _decompress(path):
+    data = path.read_bytes()
+    if path.suffix == ".zst":
+        if zstandard is None:
+            raise RuntimeError(f"{path.name} needs the zstandard package to read")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+def _safe_name(value, default):
+    """Restrict a path component to ``[A-Za-z0-9_-]`` so it cannot escape the store."""
+    return "".join(c for c in str(value) if c.isalnum() or c in "-_") or default
+
+
+def _stamp():
+    now = datetime.now(timezone.utc)
+    return now.strftime("%Y%m%dT%H%M%S") + f"{now.microsecond // 1000:03d}Z"
+
+
+class BackupStore:
+    """Chunk store plus per-backup manifests under one directory."""
+
+    def __init__(self, root=DEFAULT_STORE_DIR, min_chunk=MIN_CHUNK, max_chunk=MAX_CHUNK):
+        self.root = Path(root)
+        self.chunk_dir = self.root / "chunks"
+        self.manifest_dir = self.root / "manifests"
+        self.min_chunk = min_chunk
+        self.max_chunk = max_chunk
+
+    # -- chunks --------------------------------------------------------
+
+    def _chunk_path(self, digest):
+        """Existing path for a chunk in either codec, or None."""
+        for suffix in (".zst", ".gz"):
+            path = self.chunk_dir / digest[:2] / (digest + suffix)
+            if path.exists():
+                return path
+        return None
+
+    def _put_chunk(self, digest, data):
+        """Store a chunk unless present. Returns bytes written to disk."""
+        existing = self._chunk_path(digest)
+        if existing is not None:
+            # Refresh the mtime so a concurrent gc treats it as in use.
+            try:
+                os.utime(existing)
+                return 0
+            except FileNotFoundError:
+                pass  # gc removed it since the lookup; write it again
+        blob, suffix = _compress(data)
+        directory = self.chunk_dir / digest[:2]
+        directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=str(directory), suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(blob)
+        os.replace(tmp, directory / (digest + suffix))
+        return len(blob)
+
+    # -- backup / restore ---------------------------------------------
+
+    def backup(self, source, session_id, trigger="manual"):
+        """Back up ``source`` and return ``(manifest_path, metrics)``."""
+        source = Path(source)
+        chunks = []
+        written = 0
+        new_chunks = 0
+        whole = hashlib.sha256()
+        size = 0
+        with open(source, "rb") as f:
+            for data in iter_chunks(f, self.min_chunk, self.max_chunk):
+                digest = hashlib.sha256(data).hexdigest()
+                whole.update(data)
+                size += len(data)
+                stored = self._put_chunk(digest, data)
+                written += stored
+                new_chunks += bool(stored)
+                chunks.append([digest, len(data)])
+
+        manifest = {
+            "version": MANIFEST_VERSION,
+            "session_id": session_id,
+            "trigger": trigger,
+            "created": time.time(),
+            "source": str(source),
+            "size": size,
+            "sha256": whole.hexdigest(),
+            "chunks": chunks,
+        }
+        directory = self.manifest_dir / _safe_name(session_id, "default")
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f"{_stamp()}-{_safe_name(trigger, 'manual')}.json"
+        data = json.dumps(manifest, separators=(",", ":")).encode("utf-8")
+        fd, tmp = tempfile.mkstemp(dir=str(directory), suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+        written += len(data)
+
+        return path, {
+            "source_bytes": size,
+            "bytes_written": written,
+            "chunks": len(chunks),
+            "new_chunks": new_chunks,
+        }
+
+    def restore(self, manifest_path, output):
+        """Rebuild a backed-up transcript byte for byte into ``output``."""
+        manifest = json.loads(Path(manifest_path).read_text())
+        whole = hashlib.sha256()
+        output = Path(output)
+        fd, tmp = tempfile.mkstemp(dir=str(output.parent or "."), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                for digest, length in manifest["chunks"]:
+                    path = self._chunk_path(digest)
+                    if path is None:
+                        raise FileNotFoundError(f"missing chunk {digest}")
+                    data = _decompress(path)
+                    if len(data) != length or hashlib.sha256(data).hexdigest() != digest:
+                        raise ValueError(f"corrupt chunk {digest}")
+                    whole.update(data)
+                    f.write(data)
+            if whole.hexdigest() != manifest["sha256"]:
+                raise ValueError("restored transcript does not match manifest checksum")
+            os.replace(tmp, output)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+        return manifest["size"]
+
+    # -- listing and gc -----------------------------------------------
+
+    def manifests(self, session_id=None):
+        """Manifest paths, oldest first within each session."""
+        if not self.manifest_dir.exists():
+            return []
+        pattern = f"{_safe_name(session_id, 'default')}/*.json" if session_id else "*/*.json"
+        return sorted(self.manifest_dir.glob(pattern))
+
+    def gc(self, max_age=DEFAULT_MAX_AGE, keep_last=DEFAULT_KEEP_LAST, dry_run=False):
+        """Expire old manifests, then sweep chunks nothing refers to.
+
+        Chunks written or re-used within ``GC_GRACE`` seconds are kept
+        even if unreferenced, since a backup may be writing its manifest.
+        """
+        now = time.time()
+        live = set()
+        expired = []
+        by_session = {}
+        for path in self.manifests():
+            by_session.setdefault(path.parent.name, []).append(path)
+        for paths in by_session.values():
+            protected = set(paths[-keep_last:]) if keep_last > 0 else set()
+            for path in paths:
+                manifest = json.loads(path.read_text())
+                if path not in protected and now - manifest["created"] > max_age:
+                    expired.append(path)
+                    continue
+                live.update(digest for digest, _ in manifest["chunks"])
+
+        removed_chunks = 0
+        freed = 0
+        if self.chunk_dir.exists():
+            for path in self.chunk_dir.glob("*/*"):
+                if path.suffix == ".tmp":
+                    continue
+                digest = path.name.split(".", 1)[0]
+                if digest in live:
+                    continue
+                st = path.stat()
+                if now - st.st_mtime < GC_GRACE:
+                    continue
+                removed_chunks += 1
+                freed += st.st_size
+                if not dry_run:
+                    path.unlink()
+        for path in expired:
+            freed += path.stat().st_size
+            if not dry_run:
+                path.unlink()
+        return {
+            "manifests_removed": len(expired),
+            "chunks_removed": removed_chunks,
+            "bytes_freed": freed,
+        }
+
+    def stats(self):
+        chunk_bytes = chunk_count = 0
+        if self.chunk_dir.exists():
+            for path in self.chunk_dir.glob("*/*"):
+                chunk_count += 1
+                chunk_bytes += path.stat().st_size
+        manifests = self.manifests()
+        manifest_bytes = sum(p.stat().st_size for p in manifests)
+        logical = 0
+        for path in manifests:
+            logical += json.loads(path.read_text())["size"]
+        return {
+            "manifests": len(manifests),
+            "sessions": len({p.parent.name for p in manifests}),
+            "chunks": chunk_count,
+            "store_bytes": chunk_bytes + manifest_bytes,
+            "logical_bytes": logical,
+            "codec": "zstd" if zstandard is not None else "gzip",
+        }
+
+
+def backup_transcript(transcript_path, session_id, trigger="manual", store_dir=None):
+    """PreCompact entry point: back up the transcript, return the manifest path."""
+    store = BackupStore(store_dir or os.environ.get("CLAUDE_BACKUP_STORE", DEFAULT_STORE_DIR))
+    path, _ = store.backup(transcript_path, session_id, trigger)
+    return path
+
+
+# --------------------------------------------------------------------------
+# Simulation
+# --------------------------------------------------------------------------
+
+_SIM_WORDS = (
+    "the hook reads transcript session tool call result file edit status line token "
+    "cache board item query compaction backup chunk manifest restore error fix test "
+    "function class import return value config path json yaml python bash git commit"
+).split()
+
+
+def _synthetic_line(rng, i, session_id):
+    """One transcript line shaped like a Claude Code JSONL message."""
+    role = "assistant" if i % 2 else "user"
+    words = rng.choices(_SIM_WORDS, k=rng.choice((20, 60, 200, 800)))
+    entry = {
+        "parentUuid": f"{i - 1:032x}",
+        "sessionId": session_id,
+        "type": role,
+        "uuid": f"{i:032x}",
+        "timestamp": f"2025-09-26T{(i // 3600) % 24:02d}:{(i // 60) % 60:02d}:{i % 60:02d}.000Z",
+        "message": {
+            "role": role,
+            "content": [{"type": "text", "text": " ".join(words)}],
+        },
+    }
+    if role == "assistant":
+        entry["message"]["usage"] = {
+            "input_tokens": rng.randrange(10),
+            "cache_read_input_tokens": rng.randrange(20000, 150000),
+            "output_tokens": rng.randrange(1, 2000),
+        }
+    return (json.dumps(entry) + "\n").encode("utf-8")
+
+
+def simulate(compactions=20, growth=1_500_000, seed=7):
+    """Grow a synthetic transcript and back it up at every compaction.
+
+    Returns per-compaction rows of ``(transcript bytes, full-copy bytes
+    written, store bytes written, cumulative full-copy bytes, store size)``
+    and checks that every snapshot restores byte for byte.
+    """
+    rng = random.Random(seed)
+    session_id = "00000000-sim0-4000-8000-000000000000"
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        transcript = tmp / "session.jsonl"
+        store = BackupStore(tmp / "store")
+        copies = tmp / "copies"
+        copies.mkdir()
+        snapshots = []
+        full_total = 0
+        line_no = 0
+        for n in range(1, compactions + 1):
+            target = growth * n
+            with open(transcript, "ab") as f:
+                while f.tell() < target:
+                    f.write(_synthetic_line(rng, line_no, session_id))
+                    line_no += 1
+            size = transcript.stat().st_size
+
+            # Today: a full copy per compaction.
+            copy = copies / f"session_pre_compact_auto_{n:02d}.jsonl"
+            copy.write_bytes(transcript.read_bytes())
+            full_total += size
+
+            t0 = time.perf_counter()
+            manifest, metrics = store.backup(transcript, session_id, "auto")
+            elapsed = time.perf_counter() - t0
+            snapshots.append((manifest, hashlib.sha256(transcript.read_bytes()).hexdigest()))
+            rows.append(
+                (
+                    n,
+                    size,
+                    size,
+                    metrics["bytes_written"],
+                    full_total,
+                    store.stats()["store_bytes"],
+                    elapsed * 1000,
+                )
+            )
+
+        restored = tmp / "restored.jsonl"
+        verified = 0
+        for manifest, digest in snapshots:
+            store.restore(manifest, restored)
+            if hashlib.sha256(restored.read_bytes()).hexdigest() == digest:
+                verified += 1
+        codec = store.stats()["codec"]
+    return rows, verified, codec
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Deduplicated transcript backups")
+    parser.add_argument(
+        "--store",
+        default=os.environ.get("CLAUDE_BACKUP_STORE", str(DEFAULT_STORE_DIR)),
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    backup = sub.add_parser("backup", help="Back up a transcript")
+    backup.add_argument("transcript")
+    backup.add_argument("--session", required=True)
+    backup.add_argument("--trigger", default="manual")
+
+    listing = sub.add_parser("list", help="List backups")
+    listing.add_argument("--session")
+
+    restore = sub.add_parser("restore", help="Rebuild a backup byte for byte")
+    restore.add_argument("manifest")
+    restore.add_argument("output")
+
+    gc = sub.add_parser("gc", help="Expire old manifests and sweep unused chunks")
+    gc.add_argument("--max-age-days", type=float, default=DEFAULT_MAX_AGE / 86400)
+    gc.add_argument("--keep-last", type=int, default=DEFAULT_KEEP_LAST)
+    gc.add_argument("--dry-run", action="store_true")
+
+    sub.add_parser("stats", help="Store size and deduplication")
+
+    sim = sub.add_parser("simulate", help="Full copies vs store over a growing session")
+    sim.add_argument("--compactions", type=int, default=20)
+    sim.add_argument("--growth", type=int, default=1_500_000, help="Bytes added per compaction")
+
+    args = parser.parse_args()
+    store = BackupStore(args.store)
+
+    if args.command == "backup":
+        path, metrics = store.backup(args.transcript, args.session, args.trigger)
+        print(path)
+        print(json.dumps(metrics))
+    elif args.command == "list":
+        for path in store.manifests(args.session):
+            manifest = json.loads(path.read_text())
+            created = datetime.fromtimestamp(manifest["created"], timezone.utc)
+            print(
+                f"{created:%Y-%m-%d %H:%M:%S}  {manifest['trigger']:<7} "
+                f"{manifest['size']:>12,} bytes  {path}"
+            )
+    elif args.command == "restore":
+        size = store.restore(args.manifest, args.output)
+        print(f"Restored {size:,} bytes to {args.output}")
+    elif args.command == "gc":
+        result = store.gc(
+            max_age=args.max_age_days * 86400,
+            keep_last=args.keep_last,
+            dry_run=args.dry_run,
+        )
+        print(json.dumps(result))
+    elif args.command == "stats":
+        print(json.dumps(store.stats(), indent=2))
+    else:
+        rows, verified, codec = simulate(args.compactions, args.growth)
+        print(
+            f"{'#':>3} {'transcript':>12} {'copy wrote':>12} {'store wrote':>12} "
+            f"{'copies total':>13} {'store total':>12} {'ms':>7}"
+        )
+        for n, size, copy_bytes, store_bytes, full_total, store_total, ms in rows:
+            print(
+                f"{n:>3} {size:>12,} {copy_bytes:>12,} {store_bytes:>12,} "
+                f"{full_total:>13,} {store_total:>12,} {ms:7.1f}"
+            )
+        full_total, store_total = rows[-1][4], rows[-1][5]
+        print(
+            f"codec {codec}: store is {store_total / full_total:.1%} of full copies "
+            f"({full_total / max(store_total, 1):.0f}x smaller); "
+            f"{verified}/{len(rows)} snapshots restored byte for byte"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
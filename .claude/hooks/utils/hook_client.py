@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Tiny stdlib-only hook entry point that forwards to the resident hook daemon.
+
+Point a hook at this client instead of ``uv run`` to skip interpreter
+startup, dependency resolution and re-importing ``utils`` on every call:
+
+    "command": "python3 $CLAUDE_PROJECT_DIR/.claude/hooks/utils/hook_client.py pre_tool_use"
+
+Any arguments after the hook name (``--chat``, ``--notify`` ...) are passed
+through. The hook's stdout, stderr and exit code are reproduced exactly, so
+exit code 2 blocking and JSON responses behave as before.
+
+If the daemon is not running, the client starts it in the background and
+runs this call the usual way (``uv run <hook>.py``), so the first call is
+never slower than today and a dead daemon never breaks a hook. The fallback
+only happens when the request could not be delivered: once the daemon has
+it, a lost or late answer is reported as a hook error rather than running
+the hook a second time.
+
+The socket lives in a private ``claude-hooks-<uid>`` directory (mode 0700)
+under ``$XDG_RUNTIME_DIR`` or the temp dir. The client refuses a directory
+or socket owned by anyone else and, where the platform supports it, checks
+the daemon's uid with ``SO_PEERCRED`` before sending the environment.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import socket
+import stat
+import struct
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+
+HOOKS_DIR = Path(__file__).resolve().parent.parent
+DAEMON_SCRIPT = Path(__file__).resolve().parent / "hook_daemon.py"
+CONNECT_TIMEOUT = 0.5
+RESPONSE_TIMEOUT = float(os.environ.get("CLAUDE_HOOKS_DAEMON_TIMEOUT", "120"))
+_HEADER = struct.Struct("!I")
+
+
+def socket_dir():
+    """Private per-user directory holding the daemon sockets.
+
+    Raises PermissionError if the path exists but is not a directory that
+    only the current user can access (e.g. pre-created by someone else in
+    a shared /tmp).
+    """
+    base = os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+    path = os.path.join(base, f"claude-hooks-{os.getuid()}")
+    try:
+        os.mkdir(path, 0o700)
+    except FileExistsError:
+        pass
+    info = os.lstat(path)
+    if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid() or info.st_mode & 0o077:
+        raise PermissionError(f"{path} is not a private directory owned by uid {os.getuid()}")
+    return path
+
+
+def socket_path(hooks_dir=HOOKS_DIR):
+    """Per-user, per-project socket path for the daemon."""
+    digest = hashlib.sha1(str(hooks_dir).encode("utf-8")).hexdigest()[:12]
+    return os.path.join(socket_dir(), f"{digest}.sock")
+
+
+def peer_uid(sock):
+    """uid of the process on the other end of a Unix socket, or None if unknown."""
+    option = getattr(socket, "SO_PEERCRED", None)
+    if option is None:
+        return None
+    creds = sock.getsockopt(socket.SOL_SOCKET, option, struct.calcsize("3i"))
+    return struct.unpack("3i", creds)[1]
+
+
+def _connect(path):
+    """Connect to the daemon socket after checking who owns it."""
+    info = os.lstat(path)
+    if not stat.S_ISSOCK(info.st_mode) or info.st_uid != os.getuid():
+        raise PermissionError(f"{path} is not a socket owned by uid {os.getuid()}")
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(CONNECT_TIMEOUT)
+    try:
+        sock.connect(path)
+        uid = peer_uid(sock)
+        if uid is not None and uid != os.getuid():
+            raise PermissionError(f"{path} is served by uid {uid}")
+    except BaseException:
+        sock.close()
+        raise
+    return sock
+
+
+def send_frame(sock, payload):
+    data = json.dumps(payload).encode("utf-8")
+    sock.sendall(_HEADER.pack(len(data)) + data)
+
+
+def recv_frame(sock):
+    header = _recv_exact(sock, _HEADER.size)
+    if header is None:
+        return None
+    (length,) = _HEADER.unpack(header)
+    data = _recv_exact(sock, length)
+    if data is None:
+        return None
+    return json.loads(data.decode("utf-8"))
+
+
+def _recv_exact(sock, size):
+    chunks = []
+    while size:
+        chunk = sock.recv(min(size, 65536))
+        if not chunk:
+            return None
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+def uv_command(script, args):
+    """How the hook runs without the daemon (today's behaviour)."""
+    uv = shutil.which("uv")
+    if uv:
+        return [uv, "run", str(script), *args]
+    return [sys.executable, str(script), *args]
+
+
+def run_via_daemon(hook, args, stdin_text):
+    """Return the daemon's response dict, or None if the request was not delivered.
+
+    Only a failed connect or send returns None (safe to run the hook
+    in-process instead). Once the daemon has the request it may already be
+    running the hook, so a missing or unreadable answer becomes an error
+    response.
+    """
+    try:
+        sock = _connect(socket_path())
+    except OSError:
+        return None
+    try:
+        try:
+            sock.settimeout(RESPONSE_TIMEOUT)
+            send_frame(
+                sock,
+                {
+                    "hook": hook,
+                    "args": args,
+                    "stdin": stdin_text,
+                    "cwd": os.getcwd(),
+                    "env": dict(os.environ),
+                },
+            )
+        except OSError:
+            return None
+        try:
+            response = recv_frame(sock)
+            error = "connection closed" if response is None else "malformed response"
+        except (OSError, ValueError) as e:
+            response, error = None, e
+        if not isinstance(response, dict):
+            return {
+                "exit_code": 1,
+                "stdout": "",
+                "stderr": f"hook_client: {hook} sent to daemon but no result ({error})\n",
+            }
+        return response
+    finally:
+        sock.close()
+
+
+def start_daemon():
+    """Launch the daemon detached; it exits on its own when idle."""
+    try:
+        subprocess.Popen(
+            [sys.executable, str(DAEMON_SCRIPT), "start"],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+    except OSError:
+        pass
+
+
+def run_in_process(script, args, stdin_text):
+    """Fallback: run the hook exactly as settings.json did before."""
+    result = subprocess.run(
+        uv_command(script, args),
+        input=stdin_text,
+        capture_output=True,
+        text=True,
+    )
+    return {"exit_code": result.returncode, "stdout": result.stdout, "stderr": result.stderr}
+
+
+def main():
+    if len(sys.argv) < 2 or not sys.argv[1].isidentifier():
+        print("usage: hook_client.py <hook_name> [args...]", file=sys.stderr)
+        sys.exit(1)
+
+    hook, args = sys.argv[1], sys.argv[2:]
+    script = HOOKS_DIR / f"{hook}.py"
+    if not script.exists():
+        print(f"hook_client: no such hook {script}", file=sys.stderr)
+        sys.exit(1)
+
+    stdin_text = sys.stdin.read()
+
+    response = None
+    if os.environ.get("CLAUDE_HOOKS_DAEMON", "1") != "0":
+        response = run_via_daemon(hook, args, stdin_text)
+        if response is None:
+            start_daemon()
+    if response is None:
+        response = run_in_process(script, args, stdin_text)
+
+    sys.stdout.write(response.get("stdout", ""))
+    sys.stderr.write(response.get("stderr", ""))
+    sys.stdout.flush()
+    sys.stderr.flush()
+    sys.exit(response.get("exit_code", 0))
+
+
+if __name__ == "__main__":
+    main()
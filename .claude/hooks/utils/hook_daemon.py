@@ -0,0 +1,424 @@
+#!/usr/bin/env python3
+"""
+Resident hook server: keeps hook dependencies imported between tool calls.
+
+Every hook is a UV single-file script, so each tool call normally pays for
+a fresh interpreter, dependency resolution and re-importing ``utils`` (TTS,
+LLM clients, Monday API). This daemon listens on a Unix domain socket,
+imports each hook's top-level modules once, and forks a child per request
+that runs the hook script as ``__main__`` with the caller's stdin, argv,
+cwd and environment. The child's stdout, stderr and exit code are sent
+back to ``hook_client.py`` unchanged.
+
+- Opt-in: only hooks whose settings.json command uses hook_client.py go
+  through the daemon. ``CLAUDE_HOOKS_DAEMON=0`` disables it entirely.
+- Started lazily by the first client call and exits after
+  ``CLAUDE_HOOKS_DAEMON_IDLE`` seconds (default 900) without requests.
+- Runs under ``uv run --with <deps>`` using the union of the hooks'
+  inline script dependencies.
+- Reloads local ``utils`` modules when any hook source file changes.
+
+Command line:
+
+    python3 .claude/hooks/utils/hook_daemon.py start|stop|status
+    python3 .claude/hooks/utils/hook_daemon.py bench [--runs 5]
+"""
+
+import argparse
+import ast
+import io
+import json
+import os
+import re
+import selectors
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import time
+import traceback
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from hook_client import (  # noqa: E402
+    HOOKS_DIR,
+    peer_uid,
+    recv_frame,
+    send_frame,
+    socket_path,
+    uv_command,
+)
+
+
+HOOK_NAMES = (
+    "user_prompt_submit",
+    "pre_tool_use",
+    "post_tool_use",
+    "stop",
+    "subagent_stop",
+    "notification",
+    "pre_compact",
+    "session_start",
+)
+IDLE_TIMEOUT = float(os.environ.get("CLAUDE_HOOKS_DAEMON_IDLE", "900"))
+_QUOTED = re.compile(r"[\"']([^\"']+)[\"']")
+
+
+def hook_scripts(hooks_dir=HOOKS_DIR):
+    return sorted(p for p in Path(hooks_dir).glob("*.py") if p.stem.isidentifier())
+
+
+def script_dependencies(scripts):
+    """Union of the ``# /// script`` dependency lists of ``scripts``."""
+    deps = []
+    for script in scripts:
+        try:
+            text = script.read_text(encoding="utf-8")
+        except OSError:
+            continue
+        block = re.search(r"^# /// script$(.*?)^# ///$", text, re.M | re.S)
+        if not block:
+            continue
+        inline = re.search(r"dependencies\s*=\s*\[([^\]]*)\]", block.group(1), re.S)
+        found = inline.group(1) if inline else ""
+        for dep in _QUOTED.findall(found):
+            if dep not in deps:
+                deps.append(dep)
+    return deps
+
+
+def _source_mtime(hooks_dir=HOOKS_DIR):
+    latest = 0.0
+    for path in list(Path(hooks_dir).glob("*.py")) + list(Path(hooks_dir).glob("utils/**/*.py")):
+        try:
+            latest = max(latest, path.stat().st_mtime)
+        except OSError:
+            pass
+    return latest
+
+
+def _top_level_imports(tree):
+    """Import statements at module level, including inside try/if blocks."""
+    stack = list(tree.body)
+    while stack:
+        node = stack.pop(0)
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            yield node
+        elif isinstance(node, ast.Try):
+            stack[:0] = node.body
+        elif isinstance(node, ast.If):
+            stack[:0] = node.body + node.orelse
+
+
+class HookDaemon:
+    def __init__(self, hooks_dir=HOOKS_DIR, idle_timeout=IDLE_TIMEOUT):
+        self.hooks_dir = Path(hooks_dir)
+        self.idle_timeout = idle_timeout
+        self.path = socket_path(self.hooks_dir)
+        self.pid_path = self.path + ".pid"
+        self.code_cache = {}
+        self.loaded_mtime = 0.0
+
+    def warm(self):
+        """Import every hook's top-level modules and compile the scripts."""
+        if str(self.hooks_dir) not in sys.path:
+            sys.path.insert(0, str(self.hooks_dir))
+        self.loaded_mtime = _source_mtime(self.hooks_dir)
+        self.code_cache.clear()
+        for script in hook_scripts(self.hooks_dir):
+            try:
+                source = script.read_text(encoding="utf-8")
+                tree = ast.parse(source, str(script))
+                self.code_cache[script.stem] = (
+                    script.stat().st_mtime,
+                    compile(tree, str(script), "exec"),
+                )
+            except (OSError, SyntaxError):
+                continue
+            for node in _top_level_imports(tree):
+                module = ast.Module(body=[node], type_ignores=[])
+                try:
+                    exec(compile(module, str(script), "exec"), {})
+                except Exception:
+                    pass
+
+    def reload_if_stale(self):
+        if _source_mtime(self.hooks_dir) <= self.loaded_mtime:
+            return
+        hooks_prefix = str(self.hooks_dir) + os.sep
+        for name, module in list(sys.modules.items()):
+            module_file = getattr(module, "__file__", None) or ""
+            if module_file.startswith(hooks_prefix):
+                del sys.modules[name]
+        self.warm()
+
+    def _bind(self):
+        """Listening socket, or None if a daemon is already serving this path.
+
+        Raises OSError if the socket cannot be bound.
+        """
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(self.path)
+            return None  # another daemon already owns the socket
+        except OSError:
+            pass
+        finally:
+            probe.close()
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        old_umask = os.umask(0o177)
+        try:
+            server.bind(self.path)
+        except OSError:
+            server.close()
+            raise
+        finally:
+            os.umask(old_umask)
+        server.listen(64)
+        with open(self.pid_path, "w") as f:
+            f.write(str(os.getpid()))
+        return server
+
+    def serve(self):
+        try:
+            server = self._bind()
+        except OSError as e:
+            print(f"hook_daemon: cannot listen on {self.path}: {e}", file=sys.stderr)
+            return 1
+        if server is None:
+            return 0
+        signal.signal(signal.SIGCHLD, signal.SIG_IGN)  # auto-reap children
+        signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+        self.warm()
+
+        selector = selectors.DefaultSelector()
+        selector.register(server, selectors.EVENT_READ)
+        last_request = time.monotonic()
+        try:
+            while True:
+                if not selector.select(timeout=min(self.idle_timeout, 30)):
+                    if time.monotonic() - last_request >= self.idle_timeout:
+                        return 0
+                    continue
+                conn, _ = server.accept()
+                last_request = time.monotonic()
+                self.reload_if_stale()
+                if os.fork() == 0:
+                    server.close()
+                    signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+                    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+                    self._handle(conn)
+                    os._exit(0)
+                conn.close()
+        finally:
+            server.close()
+            for path in (self.path, self.pid_path):
+                try:
+                    os.unlink(path)
+                except OSError:
+                    pass
+
+    def _handle(self, conn):
+        try:
+            uid = peer_uid(conn)
+            if uid is not None and uid != os.getuid():
+                return
+            request = recv_frame(conn)
+            if request is None:
+                return
+            send_frame(conn, self._run(request))
+        except Exception:
+            pass
+        finally:
+            conn.close()
+
+    def _run(self, request):
+        hook = request.get("hook", "")
+        script = self.hooks_dir / f"{hook}.py"
+        if not hook.isidentifier() or not script.exists():
+            return {"exit_code": 1, "stdout": "", "stderr": f"hook_daemon: no such hook {hook}\n"}
+
+        os.chdir(request.get("cwd") or os.getcwd())
+        os.environ.clear()
+        os.environ.update(request.get("env") or {})
+        sys.argv = [str(script)] + list(request.get("args") or [])
+        sys.path[0] = str(self.hooks_dir)
+
+        out, err = io.StringIO(), io.StringIO()
+        sys.stdin = io.StringIO(request.get("stdin") or "")
+        sys.stdout, sys.stderr = out, err
+
+        exit_code = 0
+        try:
+            mtime, code = self.code_cache.get(hook, (None, None))
+            if code is None or mtime != script.stat().st_mtime:
+                code = compile(script.read_text(encoding="utf-8"), str(script), "exec")
+            exec(code, {"__name__": "__main__", "__file__": str(script), "__builtins__": __builtins__})
+        except SystemExit as e:
+            if e.code is None:
+                exit_code = 0
+            elif isinstance(e.code, int):
+                exit_code = e.code
+            else:
+                err.write(f"{e.code}\n")
+                exit_code = 1
+        except BaseException:
+            err.write(traceback.format_exc())
+            exit_code = 1
+        finally:
+            for stream in (sys.stdout, sys.stderr):
+                try:
+                    stream.flush()
+                except Exception:
+                    pass
+            sys.stdout, sys.stderr = sys.__stdout__, sys.__stderr__
+
+        return {"exit_code": exit_code, "stdout": out.getvalue(), "stderr": err.getvalue()}
+
+
+def start(hooks_dir=HOOKS_DIR):
+    """Re-launch this script under uv with the hooks' dependencies, detached."""
+    uv = shutil.which("uv")
+    if uv:
+        deps = script_dependencies(hook_scripts(hooks_dir))
+        with_args = [arg for dep in deps for arg in ("--with", dep)]
+        command = [uv, "run", "--no-project", *with_args, "python", __file__, "serve"]
+    else:
+        command = [sys.executable, __file__, "serve"]
+    subprocess.Popen(
+        command,
+        cwd=str(hooks_dir),
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+
+
+def _ping(hooks_dir=HOOKS_DIR):
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(socket_path(hooks_dir))
+        return True
+    except OSError:
+        return False
+    finally:
+        probe.close()
+
+
+def stop(hooks_dir=HOOKS_DIR):
+    try:
+        with open(socket_path(hooks_dir) + ".pid") as f:
+            os.kill(int(f.read().strip()), signal.SIGTERM)
+        return True
+    except (OSError, ValueError):
+        return False
+
+
+SAMPLE_PAYLOADS = {
+    "user_prompt_submit": {"hook_event_name": "UserPromptSubmit", "prompt": "benchmark prompt"},
+    "pre_tool_use": {"hook_event_name": "PreToolUse", "tool_name": "Bash", "tool_input": {"command": "ls -la"}},
+    "post_tool_use": {
+        "hook_event_name": "PostToolUse",
+        "tool_name": "Bash",
+        "tool_input": {"command": "ls -la"},
+        "tool_response": {"stdout": "", "stderr": "", "interrupted": False},
+    },
+    "stop": {"hook_event_name": "Stop", "stop_hook_active": False},
+    "subagent_stop": {"hook_event_name": "SubagentStop", "stop_hook_active": False},
+    "notification": {"hook_event_name": "Notification", "message": "benchmark"},
+    "pre_compact": {"hook_event_name": "PreCompact", "trigger": "manual", "custom_instructions": ""},
+    "session_start": {"hook_event_name": "SessionStart", "source": "startup"},
+}
+
+
+def _median_ms(command, stdin_text, runs):
+    timings = []
+    for _ in range(runs):
+        start_time = time.perf_counter()
+        subprocess.run(command, input=stdin_text, capture_output=True, text=True)
+        timings.append((time.perf_counter() - start_time) * 1000)
+    timings.sort()
+    return timings[len(timings) // 2]
+
+
+def run_benchmark(hooks_dir=HOOKS_DIR, runs=5):
+    """
+    Cold (``uv run <hook>``) vs warm (client -> daemon) latency per hook.
+
+    The hooks really run, so they append to logs/ like a normal tool call.
+    Payloads carry no --chat/--notify flags, so no TTS is triggered.
+    """
+    client = Path(__file__).resolve().parent / "hook_client.py"
+    if not _ping(hooks_dir):
+        start(hooks_dir)
+        deadline = time.monotonic() + 60
+        while not _ping(hooks_dir) and time.monotonic() < deadline:
+            time.sleep(0.1)
+
+    rows = []
+    for hook in HOOK_NAMES:
+        script = Path(hooks_dir) / f"{hook}.py"
+        if not script.exists():
+            continue
+        payload = dict(SAMPLE_PAYLOADS[hook], session_id="hook-daemon-bench")
+        stdin_text = json.dumps(payload)
+        cold = _median_ms(uv_command(script, []), stdin_text, runs)
+        warm_command = [sys.executable, str(client), hook]
+        _median_ms(warm_command, stdin_text, 1)  # first call after warm-up
+        warm = _median_ms(warm_command, stdin_text, runs)
+        rows.append((hook, cold, warm))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Resident Claude Code hook server")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("serve", help="Run in the foreground")
+    sub.add_parser("start", help="Start in the background")
+    sub.add_parser("stop", help="Stop a running daemon")
+    sub.add_parser("status", help="Report whether the daemon is up")
+    bench = sub.add_parser("bench", help="Cold vs warm latency for all hooks")
+    bench.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        try:
+            daemon = HookDaemon()
+        except OSError as e:
+            print(f"hook_daemon: {e}", file=sys.stderr)
+            return 1
+        return daemon.serve()
+    if args.command == "start":
+        if not _ping():
+            start()
+        return 0
+    if args.command == "stop":
+        return 0 if stop() else 1
+    if args.command == "status":
+        try:
+            path = socket_path()
+        except OSError as e:
+            print(f"hook daemon unavailable: {e}")
+            return 1
+        up = _ping()
+        print(f"hook daemon {'running' if up else 'not running'} ({path})")
+        return 0 if up else 1
+
+    rows = run_benchmark(runs=args.runs)
+    if not rows:
+        print(f"No hooks found in {HOOKS_DIR}")
+        return 1
+    print(f"{'hook':<20}  {'cold ms':>9}  {'warm ms':>9}  {'speedup':>8}")
+    for hook, cold, warm in rows:
+        print(f"{hook:<20}  {cold:9.1f}  {warm:9.1f}  {cold / warm:7.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
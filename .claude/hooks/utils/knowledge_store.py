@@ -0,0 +1,897 @@
+#!/usr/bin/env -S uv run --script
+# /// script
+# requires-python = ">=3.8"
+# dependencies = [
+#     "pyyaml",
+# ]
+# ///
+"""
+Indexed, queryable store for the knowledge notes and the monthly chronicle.
+
+YAML transcript processing writes one markdown note per response under
+``notes/knowledge/YYYY-MM-DD/`` and records every response in a monthly
+chronicle. The chronicle used to be a single ``.chronicle/YYYY-MM.json``
+array rewritten on every append, and searching past work (``/prime``,
+``/question``) meant rescanning every file. This module keeps:
+
+- Append-only monthly chronicle segments, ``.chronicle/YYYY-MM.jsonl``,
+  written through the shared JSONL log store. Legacy ``.json`` arrays are
+  still read, and ``migrate-chronicle`` converts them.
+- An SQLite FTS5 index, ``notes/knowledge/.index.db``, over title,
+  categories, status, session_id, message_id, timestamp and the YAML body.
+  Notes are indexed as they are recorded. ``sync`` only re-reads files
+  whose size or mtime changed and chronicle bytes past the last offset.
+  Before a query, ``search``/``show``/``stats`` run a quick sync that only
+  lists day directories whose mtime changed (new, renamed or deleted
+  notes); the ``sync`` command also re-checks every note for in-place edits.
+- Ranked full-text search (bm25, title weighted highest) with date range,
+  category, session and status filters.
+
+Notes and chronicle entries share ``note_id``. When both exist the markdown
+note wins because it has a path; chronicle-only entries are still
+searchable.
+
+Usage from the note writer:
+
+    from utils.knowledge_store import KnowledgeStore
+    store = KnowledgeStore()
+    store.record(chronicle_entry, note_path=note_file)
+
+Command line:
+
+    uv run .claude/hooks/utils/knowledge_store.py search "status line" [--since 2025-09-26]
+    uv run .claude/hooks/utils/knowledge_store.py search --category debugging --session e1e960e8
+    uv run .claude/hooks/utils/knowledge_store.py show 6144c6b9
+    uv run .claude/hooks/utils/knowledge_store.py sync|rebuild|stats|migrate-chronicle
+    uv run .claude/hooks/utils/knowledge_store.py bench [--notes 100000]
+"""
+
+import argparse
+import itertools
+import json
+import os
+import random
+import re
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+import yaml
+
+try:
+    from utils.log_store import JsonlLogStore, migrate_json_array
+except ImportError:  # run as a script from the utils directory
+    from log_store import JsonlLogStore, migrate_json_array
+
+
+DEFAULT_KNOWLEDGE_DIR = Path(os.environ.get("CLAUDE_PROJECT_DIR", ".")) / "notes" / "knowledge"
+INDEX_NAME = ".index.db"
+CHRONICLE_DIR = ".chronicle"
+TITLE_KEYS = ("task", "title", "achievement", "summary")
+BM25_WEIGHTS = (10.0, 4.0, 2.0, 1.0, 1.0, 1.0, 1.0)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS notes (
+    rowid INTEGER PRIMARY KEY,
+    note_id TEXT NOT NULL UNIQUE,
+    source TEXT NOT NULL,
+    path TEXT,
+    title TEXT,
+    categories TEXT,
+    status TEXT,
+    session_id TEXT,
+    message_id TEXT,
+    timestamp TEXT,
+    body TEXT
+);
+CREATE INDEX IF NOT EXISTS notes_timestamp ON notes(timestamp);
+CREATE INDEX IF NOT EXISTS notes_session ON notes(session_id);
+
+CREATE TABLE IF NOT EXISTS note_categories (
+    category TEXT NOT NULL,
+    note_rowid INTEGER NOT NULL,
+    PRIMARY KEY (category, note_rowid)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    mtime REAL,
+    size INTEGER,
+    offset INTEGER
+);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS notes_fts USING fts5(
+    title, categories, status, session_id, message_id, timestamp, body,
+    content='notes', content_rowid='rowid', tokenize='porter unicode61'
+);
+
+CREATE TRIGGER IF NOT EXISTS notes_ai AFTER INSERT ON notes BEGIN
+    INSERT INTO notes_fts(rowid, title, categories, status, session_id, message_id, timestamp, body)
+    VALUES (new.rowid, new.title, new.categories, new.status, new.session_id,
+            new.message_id, new.timestamp, new.body);
+END;
+CREATE TRIGGER IF NOT EXISTS notes_ad AFTER DELETE ON notes BEGIN
+    INSERT INTO notes_fts(notes_fts, rowid, title, categories, status, session_id, message_id, timestamp, body)
+    VALUES ('delete', old.rowid, old.title, old.categories, old.status, old.session_id,
+            old.message_id, old.timestamp, old.body);
+    DELETE FROM note_categories WHERE note_rowid = old.rowid;
+END;
+CREATE TRIGGER IF NOT EXISTS notes_au AFTER UPDATE ON notes BEGIN
+    INSERT INTO notes_fts(notes_fts, rowid, title, categories, status, session_id, message_id, timestamp, body)
+    VALUES ('delete', old.rowid, old.title, old.categories, old.status, old.session_id,
+            old.message_id, old.timestamp, old.body);
+    INSERT INTO notes_fts(rowid, title, categories, status, session_id, message_id, timestamp, body)
+    VALUES (new.rowid, new.title, new.categories, new.status, new.session_id,
+            new.message_id, new.timestamp, new.body);
+END;
+"""
+
+_FRONTMATTER = re.compile(r"\A---\n(.*?)\n---\n", re.S)
+_YAML_BLOCK = re.compile(r"## YAML Response\s*```yaml\n(.*?)\n```", re.S)
+_TITLE_LINE = re.compile(
+    r"^(?:%s):[ \t]*(.+?)[ \t]*$" % "|".join(TITLE_KEYS), re.M
+)
+_WORD = re.compile(r"\w+", re.U)
+
+
+# --------------------------------------------------------------------------
+# Parsing
+# --------------------------------------------------------------------------
+
+
+def _unquote(value):
+    if len(value) < 2 or value[0] != value[-1] or value[0] not in "\"'":
+        return value
+    if value[0] == '"':
+        try:
+            return json.loads(value)  # same escapes as YAML, much cheaper
+        except ValueError:
+            pass
+    try:
+        return yaml.safe_load(value)
+    except yaml.YAMLError:
+        return value[1:-1]
+
+
+def title_from_yaml(text, fallback="Untitled"):
+    """First top-level task/title/achievement/summary line of a YAML body."""
+    match = _TITLE_LINE.search(text or "")
+    if match:
+        title = _unquote(match.group(1))
+        if isinstance(title, str) and title.strip():
+            return title.strip()
+    return fallback
+
+
+def _slug_title(path):
+    stem = Path(path).stem
+    slug = stem.split("_", 1)[1] if "_" in stem else stem
+    return slug.replace("-", " ")
+
+
+def parse_note(path):
+    """Read a knowledge note markdown file into an index record."""
+    text = Path(path).read_text(encoding="utf-8", errors="replace")
+    meta = {}
+    match = _FRONTMATTER.match(text)
+    if match:
+        try:
+            meta = yaml.safe_load(match.group(1)) or {}
+        except yaml.YAMLError:
+            meta = {}
+    block = _YAML_BLOCK.search(text)
+    body = block.group(1) if block else text[match.end() if match else 0 :]
+    note_id = str(meta.get("id") or Path(path).stem.split("_", 1)[0])
+    return {
+        "note_id": note_id,
+        "source": "note",
+        "path": str(path),
+        "title": title_from_yaml(body, _slug_title(path)),
+        "categories": [str(c) for c in meta.get("categories") or []],
+        "status": str(meta.get("status") or ""),
+        "session_id": str(meta.get("session_id") or ""),
+        "message_id": str(meta.get("message_id") or ""),
+        "timestamp": str(meta.get("timestamp") or ""),
+        "body": body,
+    }
+
+
+def chronicle_record(entry):
+    """Turn one chronicle entry into an index record."""
+    body = entry.get("raw_yaml")
+    if body is None:
+        body = yaml.safe_dump(
+            entry.get("yaml_content") or {}, allow_unicode=True, sort_keys=False
+        )
+    content = entry.get("yaml_content")
+    status = content.get("status", "") if isinstance(content, dict) else ""
+    return {
+        "note_id": str(entry.get("note_id") or entry.get("message_id") or ""),
+        "source": "chronicle",
+        "path": None,
+        "title": title_from_yaml(body),
+        "categories": [str(c) for c in entry.get("categories") or []],
+        "status": str(status or ""),
+        "session_id": str(entry.get("session_id") or ""),
+        "message_id": str(entry.get("message_id") or ""),
+        "timestamp": str(entry.get("timestamp") or ""),
+        "body": body,
+    }
+
+
+# --------------------------------------------------------------------------
+# Chronicle segments
+# --------------------------------------------------------------------------
+
+
+def chronicle_segment(month, knowledge_dir=DEFAULT_KNOWLEDGE_DIR):
+    """Append-only JSONL store for one month of the chronicle."""
+    return JsonlLogStore(
+        month,
+        log_dir=Path(knowledge_dir) / CHRONICLE_DIR,
+        max_bytes=0,
+        max_age=0,
+        compress=False,
+    )
+
+
+def _month(timestamp):
+    return (timestamp or time.strftime("%Y-%m-%dT", time.gmtime()))[:7]
+
+
+def migrate_chronicle(knowledge_dir=DEFAULT_KNOWLEDGE_DIR):
+    """Convert legacy ``YYYY-MM.json`` arrays into JSONL segments.
+
+    Uses the log store's migration, so legacy entries are placed before
+    anything ``record()`` already appended for that month and the original
+    is renamed to ``.json.migrated``. Files that are not JSON arrays are
+    left alone. Segments are rewritten, so rebuild the index afterwards.
+    Returns ``{month: entries}``.
+    """
+    results = {}
+    chronicle = Path(knowledge_dir) / CHRONICLE_DIR
+    for path in sorted(chronicle.glob("*.json")):
+        count = migrate_json_array(path)
+        if count is not None:
+            results[path.stem] = count
+    return results
+
+
+# --------------------------------------------------------------------------
+# Store
+# --------------------------------------------------------------------------
+
+
+def _match_query(text):
+    """Quote each word so user input can never be parsed as FTS syntax."""
+    words = _WORD.findall(text or "")
+    return " ".join('"%s"' % w for w in words)
+
+
+def _day_after(value):
+    return (date.fromisoformat(value[:10]) + timedelta(days=1)).isoformat()
+
+
+class KnowledgeStore:
+    """SQLite FTS5 index over knowledge notes and chronicle entries."""
+
+    def __init__(self, knowledge_dir=None, db_path=None):
+        self.knowledge_dir = Path(knowledge_dir or DEFAULT_KNOWLEDGE_DIR)
+        db_path = Path(db_path or self.knowledge_dir / INDEX_NAME)
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(str(db_path))
+        self.db.row_factory = sqlite3.Row
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    # -- writing -------------------------------------------------------
+
+    def index_record(self, record):
+        """Insert or update one record. Chronicle entries never replace a note."""
+        if not record["note_id"]:
+            return False
+        row = self.db.execute(
+            "SELECT rowid, source FROM notes WHERE note_id = ?", (record["note_id"],)
+        ).fetchone()
+        if row and row["source"] == "note" and record["source"] == "chronicle":
+            return False
+        values = (
+            record["source"],
+            record["path"],
+            record["title"],
+            " ".join(record["categories"]),
+            record["status"],
+            record["session_id"],
+            record["message_id"],
+            record["timestamp"],
+            record["body"],
+        )
+        if row:
+            rowid = row["rowid"]
+            self.db.execute(
+                """UPDATE notes SET source=?, path=?, title=?, categories=?, status=?,
+                   session_id=?, message_id=?, timestamp=?, body=? WHERE rowid=?""",
+                values + (rowid,),
+            )
+            self.db.execute("DELETE FROM note_categories WHERE note_rowid = ?", (rowid,))
+        else:
+            rowid = self.db.execute(
+                """INSERT INTO notes (source, path, title, categories, status,
+                   session_id, message_id, timestamp, body, note_id)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                values + (record["note_id"],),
+            ).lastrowid
+        self.db.executemany(
+            "INSERT OR IGNORE INTO note_categories (category, note_rowid) VALUES (?, ?)",
+            [(c, rowid) for c in record["categories"]],
+        )
+        return True
+
+    def _track(self, path, offset=None):
+        st = os.stat(path)
+        self.db.execute(
+            "INSERT OR REPLACE INTO files (path, mtime, size, offset) VALUES (?, ?, ?, ?)",
+            (str(path), st.st_mtime, st.st_size, offset),
+        )
+
+    def add_note(self, path):
+        """Index (or re-index) one markdown note right after it is written."""
+        with self.db:
+            self.index_record(parse_note(path))
+            self._track(path)
+
+    def record(self, entry, note_path=None):
+        """Append a chronicle entry to its monthly segment and index it.
+
+        The append is what must not be lost; if indexing fails the error is
+        reported on stderr, False is returned and the next ``sync`` picks
+        the entry up.
+        """
+        segment = chronicle_segment(_month(entry.get("timestamp")), self.knowledge_dir)
+        segment.append(entry)
+        try:
+            row = self.db.execute(
+                "SELECT path, mtime, size, offset FROM files WHERE path = ?",
+                (str(segment.path),),
+            ).fetchone()
+            with self.db:
+                # Reading from the tracked offset also picks up entries other
+                # sessions appended since the last sync.
+                self._sync_chronicle(segment.path, row)
+                if note_path is not None:
+                    self.index_record(parse_note(note_path))
+                    self._track(note_path)
+        except (sqlite3.Error, OSError, ValueError, yaml.YAMLError) as exc:
+            print(f"knowledge_store: indexing deferred to next sync: {exc}", file=sys.stderr)
+            return False
+        return True
+
+    # -- syncing -------------------------------------------------------
+
+    def _tracked(self, where="1", params=()):
+        return {
+            row["path"]: row
+            for row in self.db.execute(
+                f"SELECT path, mtime, size, offset FROM files WHERE {where}", params
+            )
+        }
+
+    def _tracked_under(self, directory):
+        # Range scan on the primary key: every path starting with "<dir>/".
+        prefix = str(directory) + os.sep
+        upper = prefix[:-1] + chr(ord(os.sep) + 1)
+        return self._tracked("path >= ? AND path < ?", (prefix, upper))
+
+    def sync(self, full=True):
+        """Bring the index up to date with the files on disk.
+
+        With ``full=False`` day directories whose mtime is unchanged are not
+        listed, so new, renamed or deleted notes are picked up without a
+        ``stat`` per note; in-place edits of existing notes need a full sync.
+        Returns counts of notes and chronicle entries (re)indexed and notes
+        removed.
+        """
+        stats = {"notes": 0, "chronicle": 0, "removed": 0}
+        with self.db:
+            # Day directories and chronicle segments; notes are only loaded
+            # for the directories that get listed.
+            tracked = self._tracked() if full else self._tracked("path NOT LIKE '%.md'")
+            seen = set()
+            with os.scandir(self.knowledge_dir) as entries:
+                days = sorted(
+                    (e for e in entries if e.is_dir() and not e.name.startswith(".")),
+                    key=lambda e: e.name,
+                )
+            for entry in days:
+                key = entry.path
+                seen.add(key)
+                # Stat before listing: a note added mid-scan is either listed
+                # now or moves the mtime past the one recorded here.
+                mtime = entry.stat().st_mtime
+                row = tracked.get(key)
+                if full or not row or row["mtime"] != mtime:
+                    indexed, removed = self._sync_day(Path(key))
+                    stats["notes"] += indexed
+                    stats["removed"] += removed
+                    self.db.execute(
+                        "INSERT OR REPLACE INTO files (path, mtime, size, offset) "
+                        "VALUES (?, ?, 0, NULL)",
+                        (key, mtime),
+                    )
+
+            chronicle = self.knowledge_dir / CHRONICLE_DIR
+            for path in sorted(chronicle.glob("*.json")) + sorted(chronicle.glob("*.jsonl")):
+                key = str(path)
+                seen.add(key)
+                stats["chronicle"] += self._sync_chronicle(path, tracked.get(key))
+
+            for key in tracked:
+                if key in seen or os.path.dirname(key) in seen:
+                    continue
+                if key.endswith(".md"):
+                    stats["removed"] += self.db.execute(
+                        "DELETE FROM notes WHERE path = ?", (key,)
+                    ).rowcount
+                elif os.path.dirname(key) == str(self.knowledge_dir):
+                    # A day directory that is gone: drop its notes too.
+                    for note_key in self._tracked_under(key):
+                        stats["removed"] += self._forget_note(note_key)
+                self.db.execute("DELETE FROM files WHERE path = ?", (key,))
+        return stats
+
+    def _sync_day(self, day):
+        """Index new or changed notes in one day directory, drop deleted ones."""
+        tracked = self._tracked_under(day)
+        indexed = removed = 0
+        for path in sorted(day.glob("*.md")):
+            key = str(path)
+            st = path.stat()
+            row = tracked.pop(key, None)
+            if row and row["mtime"] == st.st_mtime and row["size"] == st.st_size:
+                continue
+            self.index_record(parse_note(path))
+            self._track(path)
+            indexed += 1
+        for key in tracked:
+            removed += self._forget_note(key)
+        return indexed, removed
+
+    def _forget_note(self, key):
+        self.db.execute("DELETE FROM files WHERE path = ?", (key,))
+        return self.db.execute("DELETE FROM notes WHERE path = ?", (key,)).rowcount
+
+    def _sync_chronicle(self, path, row):
+        st = path.stat()
+        if row and row["mtime"] == st.st_mtime and row["size"] == st.st_size:
+            return 0
+        count = 0
+        if path.suffix == ".json":
+            # Legacy arrays are rewritten in place, so re-read them whole.
+            # An unreadable file is skipped until it changes again.
+            try:
+                with open(path, encoding="utf-8") as f:
+                    entries = json.load(f)
+            except (OSError, ValueError):
+                entries = []
+            for entry in entries if isinstance(entries, list) else []:
+                if isinstance(entry, dict):
+                    count += self.index_record(chronicle_record(entry))
+            self._track(path)
+            return count
+        offset = row["offset"] if row and row["offset"] and row["offset"] <= st.st_size else 0
+        with open(path, "rb") as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # a writer is mid-append; pick it up next time
+                offset += len(line)
+                if not line.strip():
+                    continue
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # torn or hand-edited line; skip it, keep going
+                if isinstance(entry, dict):
+                    count += self.index_record(chronicle_record(entry))
+        self._track(path, offset)
+        return count
+
+    def rebuild(self):
+        """Drop the index and re-read everything from disk."""
+        with self.db:
+            self.db.execute("DELETE FROM notes")
+            self.db.execute("DELETE FROM note_categories")
+            self.db.execute("DELETE FROM files")
+            self.db.execute("INSERT INTO notes_fts(notes_fts) VALUES ('rebuild')")
+        stats = self.sync()
+        self.db.execute("INSERT INTO notes_fts(notes_fts) VALUES ('optimize')")
+        self.db.commit()
+        return stats
+
+    # -- querying ------------------------------------------------------
+
+    def search(
+        self,
+        text=None,
+        since=None,
+        until=None,
+        category=None,
+        session=None,
+        status=None,
+        limit=20,
+        raw=False,
+    ):
+        """Ranked full-text search with optional filters.
+
+        ``since``/``until`` are ISO dates or timestamps (``until`` is
+        inclusive of the whole day). ``session`` matches a session_id
+        prefix. Without ``text`` the newest matching notes come first.
+        """
+        where, params = [], []
+        if since:
+            where.append("n.timestamp >= ?")
+            params.append(since)
+        if until:
+            where.append("n.timestamp < ?")
+            params.append(_day_after(until) if len(until) == 10 else until)
+        if category:
+            where.append(
+                "n.rowid IN (SELECT note_rowid FROM note_categories WHERE category = ?)"
+            )
+            params.append(category)
+        if session:
+            where.append("n.session_id >= ? AND n.session_id < ?")
+            params.extend((session, session + "\uffff"))
+        if status:
+            where.append("n.status LIKE ?")
+            params.append(f"%{status}%")
+        filters = " AND ".join(where)
+
+        match = text if raw else _match_query(text)
+        if not match:
+            sql = f"""
+                SELECT n.note_id, n.title, n.timestamp, n.session_id, n.categories,
+                       n.status, n.path, n.source, '' AS snippet, NULL AS rank
+                FROM notes n
+                {"WHERE " + filters if filters else ""}
+                ORDER BY n.timestamp DESC LIMIT ?"""
+            return [dict(row) for row in self.db.execute(sql, params + [limit])]
+
+        # Rank inside the FTS table first, so the notes table is only
+        # touched for filters and snippets only built for returned rows.
+        weights = ", ".join(str(w) for w in BM25_WEIGHTS)
+        source = "notes_fts"
+        if filters:
+            source = "notes_fts JOIN notes n ON n.rowid = notes_fts.rowid"
+        sql = f"""
+            SELECT n.note_id, n.title, n.timestamp, n.session_id, n.categories,
+                   n.status, n.path, n.source,
+                   snippet(notes_fts, 6, '[', ']', '...', 12) AS snippet,
+                   hit.rank
+            FROM (
+                SELECT notes_fts.rowid AS rowid, bm25(notes_fts, {weights}) AS rank
+                FROM {source}
+                WHERE notes_fts MATCH ? {"AND " + filters if filters else ""}
+                ORDER BY rank LIMIT ?
+            ) AS hit
+            JOIN notes_fts ON notes_fts.rowid = hit.rowid
+            JOIN notes n ON n.rowid = hit.rowid
+            WHERE notes_fts MATCH ?
+            ORDER BY hit.rank"""
+        params = [match] + params + [limit, match]
+        return [dict(row) for row in self.db.execute(sql, params)]
+
+    def get(self, note_id):
+        """Full record for a note id (or unique id prefix)."""
+        row = self.db.execute(
+            "SELECT * FROM notes WHERE note_id >= ? AND note_id < ? ORDER BY note_id LIMIT 2",
+            (note_id, note_id + "\uffff"),
+        ).fetchall()
+        if len(row) != 1:
+            return None
+        return dict(row[0])
+
+    def stats(self):
+        db = self.db
+        return {
+            "notes": db.execute("SELECT COUNT(*) FROM notes WHERE source = 'note'").fetchone()[0],
+            "chronicle_only": db.execute(
+                "SELECT COUNT(*) FROM notes WHERE source = 'chronicle'"
+            ).fetchone()[0],
+            "sessions": db.execute(
+                "SELECT COUNT(DISTINCT session_id) FROM notes"
+            ).fetchone()[0],
+            "categories": {
+                row[0]: row[1]
+                for row in db.execute(
+                    "SELECT category, COUNT(*) FROM note_categories GROUP BY category ORDER BY 2 DESC"
+                )
+            },
+            "first": db.execute("SELECT MIN(timestamp) FROM notes").fetchone()[0],
+            "last": db.execute("SELECT MAX(timestamp) FROM notes").fetchone()[0],
+        }
+
+
+# --------------------------------------------------------------------------
+# Benchmark
+# --------------------------------------------------------------------------
+
+_BENCH_TOPICS = (
+    "status line session token context window hook daemon cache monday board "
+    "priority workload expense budget scheduler complexity transcript cursor "
+    "security rule block warn audit log rotation segment speech queue provider "
+    "voice completion knowledge chronicle index search query sqlite fts migration "
+    "benchmark latency regression fix implement analyze investigate refactor deploy"
+).split()
+_BENCH_CATEGORIES = (
+    "debugging", "documented", "completed", "general", "monday", "security",
+    "performance", "status-line", "hooks", "research",
+)
+_BENCH_SYLLABLES = ("ka", "ro", "mi", "te", "su", "na", "lo", "vi", "de", "pa", "zu", "ri")
+
+
+def _bench_vocabulary(rng, size=20000):
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choices(_BENCH_SYLLABLES, k=rng.randrange(2, 5))))
+    words = sorted(words)
+    weights = [1.0 / (rank + 1) for rank in range(len(words))]  # Zipf-like
+    return words, list(itertools.accumulate(weights))
+
+
+def synthetic_entry(i, rng, vocabulary, sessions=500, days=365):
+    """One chronicle entry: a few topic words over Zipf-distributed filler."""
+    words, cum_weights = vocabulary
+    day = date(2025, 1, 1) + timedelta(days=rng.randrange(days))
+    timestamp = f"{day.isoformat()}T{rng.randrange(24):02d}:{rng.randrange(60):02d}:00.000Z"
+    topics = rng.sample(_BENCH_TOPICS, 3)
+    lines = [
+        f'task: "{" ".join(topics).capitalize()}"',
+        f'status: "{rng.choice(["success", "in_progress", "validated"])}"',
+    ]
+    for section in range(rng.randrange(3, 8)):
+        lines.append(f"{rng.choice(topics)}_{section}:")
+        for _ in range(rng.randrange(2, 6)):
+            filler = rng.choices(words, cum_weights=cum_weights, k=8)
+            lines.append(f'  - "{rng.choice(topics)} {" ".join(filler)}"')
+    return {
+        "note_id": f"{i:08x}",
+        "timestamp": timestamp,
+        "session_id": f"{rng.randrange(sessions):08x}-0000-4000-8000-000000000000",
+        "message_id": f"msg_{i:024d}",
+        "categories": rng.sample(_BENCH_CATEGORIES, rng.randrange(1, 4)),
+        "raw_yaml": "\n".join(lines),
+    }
+
+
+def _scan_files(paths, needle):
+    """Today's search: open every note and look for the phrase."""
+    hits = []
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            if needle in f.read().lower():
+                hits.append(path)
+    return hits
+
+
+def _note_text(entry):
+    """Render a synthetic entry the way the note writer lays out a note."""
+    categories = "".join(f"\n- {c}" for c in entry["categories"])
+    return (
+        f"---\ncategories:{categories}\nid: {entry['note_id']}\n"
+        f"session_id: {entry['session_id']}\ntimestamp: '{entry['timestamp']}'\n---\n\n"
+        f"## YAML Response\n\n```yaml\n{entry['raw_yaml']}\n```\n"
+    )
+
+
+def _median_ms(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    samples.sort()
+    return samples[len(samples) // 2]
+
+
+def run_benchmark(notes=100000, repeat=20, scan_files=5000, seed=7):
+    rng = random.Random(seed)
+    vocabulary = _bench_vocabulary(rng)
+    entries = [synthetic_entry(i, rng, vocabulary) for i in range(notes)]
+    result = {"notes": notes}
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        store = KnowledgeStore(knowledge_dir=tmp)
+        start = time.perf_counter()
+        with store.db:
+            for entry in entries:
+                store.index_record(chronicle_record(entry))
+        store.db.execute("INSERT INTO notes_fts(notes_fts) VALUES ('optimize')")
+        store.db.commit()
+        result["index_s"] = time.perf_counter() - start
+
+        session = entries[0]["session_id"][:8]
+        queries = {
+            "ranked 'status line'": dict(text="status line"),
+            "ranked three terms": dict(text="chronicle migration regression"),
+            "term in every note": dict(text="status"),
+            "category + month": dict(
+                text="cache", category="performance", since="2025-06-01", until="2025-06-30"
+            ),
+            "session filter": dict(session=session),
+            "newest 20": dict(),
+        }
+        timings = []
+        for label, kwargs in queries.items():
+            samples = []
+            for _ in range(repeat):
+                t0 = time.perf_counter()
+                rows = store.search(**kwargs)
+                samples.append((time.perf_counter() - t0) * 1000)
+            samples.sort()
+            timings.append((label, len(rows), samples[len(samples) // 2], samples[-1]))
+        result["queries"] = timings
+
+        note_dir = tmp / "2025-12-31"
+        note_dir.mkdir()
+        note = note_dir / "ffffffff_Incremental-update.md"
+        note.write_text(
+            "---\ncategories:\n- performance\nid: ffffffff\nsession_id: s\n"
+            "status: success\ntimestamp: '2025-12-31T23:59:00.000Z'\n---\n\n"
+            '## YAML Response\n\n```yaml\ntask: "Incremental update"\n```\n'
+        )
+        t0 = time.perf_counter()
+        store.add_note(note)
+        result["add_note_ms"] = (time.perf_counter() - t0) * 1000
+
+        # The CLI path: what `search` costs including its pre-query sync,
+        # with ``scan_files`` notes on disk in their day directories.
+        count = min(scan_files, notes)
+        paths = []
+        for entry in entries[:count]:
+            day_dir = tmp / entry["timestamp"][:10]
+            day_dir.mkdir(exist_ok=True)
+            path = day_dir / f"{entry['note_id']}_note.md"
+            path.write_text(_note_text(entry), encoding="utf-8")
+            paths.append(path)
+        store.sync()
+        cli_repeat = max(repeat // 4, 3)
+        result["full_sync_ms"] = _median_ms(store.sync, cli_repeat)
+        result["quick_sync_ms"] = _median_ms(lambda: store.sync(full=False), cli_repeat)
+        result["cli_search_ms"] = _median_ms(
+            lambda: (store.sync(full=False), store.search("status line")), cli_repeat
+        )
+        store.close()
+
+        t0 = time.perf_counter()
+        _scan_files(paths, "status line")
+        scan_ms = (time.perf_counter() - t0) * 1000
+        result["scan_files"] = count
+        result["scan_ms"] = scan_ms
+        result["scan_projected_ms"] = scan_ms * notes / count if count else 0.0
+    return result
+
+
+def _print_rows(rows, as_json=False):
+    if as_json:
+        print(json.dumps(rows, indent=2, ensure_ascii=False))
+        return
+    if not rows:
+        print("No matching notes")
+    for row in rows:
+        print(f"{row['timestamp'][:16]}  {row['note_id']}  {row['title']}")
+        print(f"    [{row['categories']}] session {row['session_id'][:8]}  {row['path'] or '(chronicle)'}")
+        if row["snippet"]:
+            print(f"    {' '.join(row['snippet'].split())}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Knowledge note index and chronicle")
+    parser.add_argument("--knowledge-dir", default=None)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    search = sub.add_parser("search", help="Ranked full-text search with filters")
+    search.add_argument("query", nargs="?", help="Words to match (all must appear)")
+    search.add_argument("--since", help="ISO date or timestamp")
+    search.add_argument("--until", help="ISO date (inclusive) or timestamp")
+    search.add_argument("--category")
+    search.add_argument("--session", help="session_id or prefix")
+    search.add_argument("--status")
+    search.add_argument("--limit", type=int, default=20)
+    search.add_argument("--raw", action="store_true", help="Pass query as FTS5 syntax")
+    search.add_argument("--json", action="store_true")
+    search.add_argument("--no-sync", action="store_true", help="Skip the pre-query sync")
+
+    show = sub.add_parser("show", help="Print one note's indexed record")
+    show.add_argument("note_id")
+
+    sub.add_parser("sync", help="Index new or changed notes and chronicle entries")
+    sub.add_parser("rebuild", help="Rebuild the index from disk")
+    sub.add_parser("stats", help="Index summary")
+    sub.add_parser("migrate-chronicle", help="Convert .chronicle/*.json arrays to JSONL")
+
+    bench = sub.add_parser("bench", help="Query latency on synthetic notes")
+    bench.add_argument("--notes", type=int, default=100000)
+    bench.add_argument("--repeat", type=int, default=20)
+    bench.add_argument("--scan-files", type=int, default=5000)
+
+    args = parser.parse_args()
+
+    if args.command == "bench":
+        r = run_benchmark(notes=args.notes, repeat=args.repeat, scan_files=args.scan_files)
+        print(f"indexed {r['notes']} notes in {r['index_s']:.1f}s")
+        print(f"{'query':<24} {'rows':>5} {'p50 ms':>8} {'max ms':>8}")
+        for label, rows, p50, worst in r["queries"]:
+            print(f"{label:<24} {rows:>5} {p50:8.2f} {worst:8.2f}")
+        print(f"add_note at {r['notes']} notes: {r['add_note_ms']:.2f} ms")
+        print(
+            f"CLI search with {r['scan_files']} note files: {r['cli_search_ms']:.2f} ms "
+            f"(quick sync {r['quick_sync_ms']:.2f} ms, full sync {r['full_sync_ms']:.1f} ms)"
+        )
+        print(
+            f"file rescan: {r['scan_ms']:.0f} ms for {r['scan_files']} files "
+            f"(~{r['scan_projected_ms']:.0f} ms projected for {r['notes']})"
+        )
+        return 0
+
+    if args.command == "migrate-chronicle":
+        results = migrate_chronicle(args.knowledge_dir or DEFAULT_KNOWLEDGE_DIR)
+        if not results:
+            print("No legacy chronicle arrays found")
+            return 0
+        for month, count in results.items():
+            print(f"{month}: migrated {count} entries")
+        # Tracked offsets point into the old segment contents.
+        store = KnowledgeStore(knowledge_dir=args.knowledge_dir)
+        try:
+            print(json.dumps(store.rebuild()))
+        finally:
+            store.close()
+        return 0
+
+    store = KnowledgeStore(knowledge_dir=args.knowledge_dir)
+    try:
+        if args.command == "rebuild":
+            print(json.dumps(store.rebuild()))
+        elif args.command == "sync":
+            print(json.dumps(store.sync()))
+        elif args.command == "stats":
+            store.sync(full=False)
+            print(json.dumps(store.stats(), indent=2, ensure_ascii=False))
+        elif args.command == "show":
+            store.sync(full=False)
+            record = store.get(args.note_id)
+            if record is None:
+                print(f"No unique note matching {args.note_id}", file=sys.stderr)
+                return 1
+            print(json.dumps(record, indent=2, ensure_ascii=False))
+        else:
+            if not args.no_sync:
+                store.sync(full=False)
+            _print_rows(
+                store.search(
+                    args.query,
+                    since=args.since,
+                    until=args.until,
+                    category=args.category,
+                    session=args.session,
+                    status=args.status,
+                    limit=args.limit,
+                    raw=args.raw,
+                ),
+                as_json=args.json,
+            )
+    finally:
+        store.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,394 @@
+#!/usr/bin/env -S uv run --script
+# /// script
+# requires-python = ">=3.8"
+# dependencies = []
+# ///
+"""
+Append-only JSONL log store shared by all hooks.
+
+Each hook used to keep its audit trail as one JSON array in logs/<hook>.json,
+which meant loading, parsing and rewriting the whole file on every call.
+This store appends one JSON object per line instead, so a write costs the
+same whether the log holds ten entries or a hundred thousand.
+
+- Writes are serialised across concurrent Claude Code sessions with an
+  advisory lock on a sidecar ``<name>.jsonl.lock`` file.
+- The active segment is rotated once it exceeds ``max_bytes`` or is older
+  than ``max_age``; rotated segments are optionally gzipped and, if
+  ``keep_segments`` is set, pruned to the newest N.
+- ``migrate`` converts existing logs/*.json arrays into the JSONL format.
+
+Usage from a hook:
+
+    from utils.log_store import append_log
+    append_log("pre_tool_use", input_data)
+
+Command line:
+
+    uv run .claude/hooks/utils/log_store.py migrate [--log-dir logs]
+    uv run .claude/hooks/utils/log_store.py bench [--sizes 0,1000,10000,100000]
+"""
+
+import argparse
+import gzip
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to unlocked appends
+    fcntl = None
+
+
+DEFAULT_LOG_DIR = "logs"
+DEFAULT_MAX_BYTES = 10 * 1024 * 1024
+DEFAULT_MAX_AGE = 7 * 24 * 3600
+DEFAULT_KEEP_SEGMENTS = None  # audit logs: keep every rotated segment
+
+
+class _FileLock:
+    """Exclusive advisory lock on a sidecar file (no-op without fcntl)."""
+
+    def __init__(self, path):
+        self.path = path
+        self.fd = None
+
+    def __enter__(self):
+        self.fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        if fcntl is not None:
+            fcntl.flock(self.fd, fcntl.LOCK_EX)
+        return self
+
+    def read_text(self):
+        os.lseek(self.fd, 0, os.SEEK_SET)
+        return os.read(self.fd, 64).decode("ascii", "ignore").strip()
+
+    def write_text(self, text):
+        os.ftruncate(self.fd, 0)
+        os.lseek(self.fd, 0, os.SEEK_SET)
+        os.write(self.fd, text.encode("ascii"))
+
+    def __exit__(self, *exc):
+        if fcntl is not None:
+            fcntl.flock(self.fd, fcntl.LOCK_UN)
+        os.close(self.fd)
+        self.fd = None
+        return False
+
+
+class JsonlLogStore:
+    """
+    Append-only JSONL log with size/age rotation.
+
+    The active segment lives at ``<log_dir>/<name>.jsonl``. Rotated segments
+    are named ``<name>.<UTC timestamp>.jsonl`` (plus ``.gz`` when compressed)
+    and sort chronologically by file name.
+    """
+
+    def __init__(
+        self,
+        name,
+        log_dir=DEFAULT_LOG_DIR,
+        max_bytes=DEFAULT_MAX_BYTES,
+        max_age=DEFAULT_MAX_AGE,
+        compress=True,
+        keep_segments=DEFAULT_KEEP_SEGMENTS,
+    ):
+        self.name = name
+        self.log_dir = Path(log_dir)
+        self.path = self.log_dir / f"{name}.jsonl"
+        self.lock_path = self.log_dir / f"{name}.jsonl.lock"
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.compress = compress
+        self.keep_segments = keep_segments
+
+    def append(self, entry):
+        """Append one entry. Cost is independent of the log's size."""
+        self.append_many([entry])
+
+    def append_many(self, entries):
+        """Append several entries under a single lock acquisition."""
+        data = "".join(
+            json.dumps(e, ensure_ascii=False, default=str) + "\n" for e in entries
+        ).encode("utf-8")
+        if not data:
+            return
+
+        self.log_dir.mkdir(parents=True, exist_ok=True)
+        rotated = None
+        with _FileLock(self.lock_path) as lock:
+            rotated = self._maybe_rotate(lock, len(data))
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, data)
+            finally:
+                os.close(fd)
+
+        # Compress outside the lock so other writers are not held up.
+        if rotated is not None and self.compress:
+            _gzip_file(rotated)
+        if rotated is not None:
+            self._prune_segments()
+
+    def _maybe_rotate(self, lock, incoming):
+        """Rotate the active segment if needed. Returns the rotated path."""
+        now = time.time()
+        try:
+            size = self.path.stat().st_size
+        except FileNotFoundError:
+            lock.write_text(str(int(now)))
+            return None
+
+        started = lock.read_text()
+        try:
+            started = float(started)
+        except ValueError:
+            started = now
+            lock.write_text(str(int(now)))
+
+        too_big = self.max_bytes and size > 0 and size + incoming > self.max_bytes
+        too_old = self.max_age and size > 0 and now - started > self.max_age
+        if not (too_big or too_old):
+            return None
+
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+        rotated = self.log_dir / f"{self.name}.{stamp}.jsonl"
+        os.replace(self.path, rotated)
+        lock.write_text(str(int(now)))
+        return rotated
+
+    def segments(self):
+        """All segments oldest first, ending with the active one."""
+        found = {
+            p.name: p
+            for p in self.log_dir.glob(f"{self.name}.*.jsonl*")
+            if not p.name.endswith(".lock") and not p.name.endswith(".tmp")
+        }
+        # Mid-compression both forms exist briefly; prefer the finished .gz.
+        rotated = [
+            p for n, p in sorted(found.items()) if n + ".gz" not in found
+        ]
+        if self.path.exists():
+            rotated.append(self.path)
+        return rotated
+
+    def iter_entries(self, include_rotated=True):
+        """Yield entries oldest first, skipping torn or malformed lines."""
+        paths = self.segments() if include_rotated else [self.path]
+        for path in paths:
+            if not path.exists():
+                continue
+            opener = gzip.open if path.suffix == ".gz" else open
+            with opener(path, "rt", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+
+    def _prune_segments(self):
+        if not self.keep_segments:
+            return
+        rotated = [p for p in self.segments() if p != self.path]
+        for old in rotated[: -self.keep_segments]:
+            try:
+                old.unlink()
+            except OSError:
+                pass
+
+
+def _gzip_file(path):
+    gz_path = path.with_name(path.name + ".gz")
+    tmp_path = path.with_name(path.name + ".gz.tmp")
+    try:
+        with open(path, "rb") as src, gzip.open(tmp_path, "wb") as dst:
+            shutil.copyfileobj(src, dst)
+        os.replace(tmp_path, gz_path)
+        path.unlink()
+    except OSError:
+        # Leave the uncompressed segment in place; it is still readable.
+        try:
+            tmp_path.unlink()
+        except OSError:
+            pass
+
+
+_stores = {}
+
+
+def get_store(name, log_dir=None, **kwargs):
+    """Return a cached store for ``name``. Settings come from env if unset."""
+    log_dir = log_dir or os.environ.get("CLAUDE_HOOKS_LOG_DIR", DEFAULT_LOG_DIR)
+    key = (name, str(log_dir))
+    if key not in _stores:
+        kwargs.setdefault(
+            "max_bytes", int(os.environ.get("CLAUDE_HOOKS_LOG_MAX_BYTES", DEFAULT_MAX_BYTES))
+        )
+        kwargs.setdefault(
+            "max_age", int(os.environ.get("CLAUDE_HOOKS_LOG_MAX_AGE", DEFAULT_MAX_AGE))
+        )
+        kwargs.setdefault(
+            "compress", os.environ.get("CLAUDE_HOOKS_LOG_COMPRESS", "1") != "0"
+        )
+        _stores[key] = JsonlLogStore(name, log_dir=log_dir, **kwargs)
+    return _stores[key]
+
+
+def append_log(name, entry, log_dir=None):
+    """Append ``entry`` to logs/<name>.jsonl. Drop-in for the old JSON rewrite."""
+    get_store(name, log_dir).append(entry)
+
+
+def migrate_json_array(json_path, remove_original=False):
+    """
+    Convert a legacy ``<name>.json`` array into ``<name>.jsonl``.
+
+    Migrated entries are placed before anything already written to the
+    JSONL file, so ordering is preserved. The original is renamed to
+    ``<name>.json.migrated`` (or deleted with ``remove_original``).
+    Returns the number of entries migrated, or None if skipped.
+    """
+    json_path = Path(json_path)
+    try:
+        with open(json_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+    if not isinstance(data, list):
+        return None
+
+    store = JsonlLogStore(json_path.stem, log_dir=json_path.parent)
+    with _FileLock(store.lock_path):
+        fd, tmp_name = tempfile.mkstemp(
+            dir=json_path.parent, prefix=f".{json_path.stem}.", suffix=".tmp"
+        )
+        with os.fdopen(fd, "w", encoding="utf-8") as out:
+            for entry in data:
+                out.write(json.dumps(entry, ensure_ascii=False, default=str) + "\n")
+            if store.path.exists():
+                with open(store.path, "r", encoding="utf-8") as existing:
+                    shutil.copyfileobj(existing, out)
+        os.replace(tmp_name, store.path)
+
+    if remove_original:
+        json_path.unlink()
+    else:
+        os.replace(json_path, json_path.with_name(json_path.name + ".migrated"))
+    return len(data)
+
+
+def migrate_log_dir(log_dir=DEFAULT_LOG_DIR, remove_original=False):
+    """Migrate every JSON array log in ``log_dir``. Returns {name: count}."""
+    results = {}
+    for json_path in sorted(Path(log_dir).glob("*.json")):
+        count = migrate_json_array(json_path, remove_original=remove_original)
+        if count is not None:
+            results[json_path.name] = count
+    return results
+
+
+def _sample_entry(i):
+    return {
+        "session_id": "bench-session",
+        "hook_event_name": "PostToolUse",
+        "tool_name": "Bash",
+        "tool_input": {"command": f"ls -la /tmp/dir_{i}", "description": "List files"},
+        "tool_response": {"stdout": "x" * 200, "stderr": "", "interrupted": False},
+    }
+
+
+def _legacy_append(path, entry):
+    """The original hook pattern: load the array, append, rewrite it all."""
+    if path.exists():
+        with open(path, "r") as f:
+            try:
+                log_data = json.load(f)
+            except (json.JSONDecodeError, ValueError):
+                log_data = []
+    else:
+        log_data = []
+    log_data.append(entry)
+    with open(path, "w") as f:
+        json.dump(log_data, f, indent=2)
+
+
+def run_benchmark(sizes, samples=200, legacy_samples=5, legacy_max=20000):
+    """Time a single append at each log size for both storage formats."""
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        for size in sizes:
+            store = JsonlLogStore(
+                f"bench_{size}", log_dir=tmp, max_bytes=0, max_age=0, compress=False
+            )
+            store.append_many(_sample_entry(i) for i in range(size))
+            start = time.perf_counter()
+            for i in range(samples):
+                store.append(_sample_entry(size + i))
+            jsonl_ms = (time.perf_counter() - start) * 1000 / samples
+
+            legacy_ms = None
+            if size <= legacy_max:
+                legacy_path = tmp / f"legacy_{size}.json"
+                with open(legacy_path, "w") as f:
+                    json.dump([_sample_entry(i) for i in range(size)], f, indent=2)
+                start = time.perf_counter()
+                for i in range(legacy_samples):
+                    _legacy_append(legacy_path, _sample_entry(size + i))
+                legacy_ms = (time.perf_counter() - start) * 1000 / legacy_samples
+
+            rows.append((size, jsonl_ms, legacy_ms))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JSONL hook log store")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    migrate = sub.add_parser("migrate", help="Convert logs/*.json arrays to JSONL")
+    migrate.add_argument("--log-dir", default=DEFAULT_LOG_DIR)
+    migrate.add_argument(
+        "--remove-original", action="store_true", help="Delete instead of renaming"
+    )
+
+    bench = sub.add_parser("bench", help="Per-call append latency vs log size")
+    bench.add_argument("--sizes", default="0,1000,10000,100000")
+    bench.add_argument("--samples", type=int, default=200)
+    bench.add_argument(
+        "--legacy-max",
+        type=int,
+        default=20000,
+        help="Largest size to time the legacy whole-file rewrite at",
+    )
+
+    args = parser.parse_args()
+
+    if args.command == "migrate":
+        results = migrate_log_dir(args.log_dir, remove_original=args.remove_original)
+        if not results:
+            print(f"No JSON array logs found in {args.log_dir}")
+        for name, count in results.items():
+            print(f"{name}: migrated {count} entries")
+        return 0
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    rows = run_benchmark(sizes, samples=args.samples, legacy_max=args.legacy_max)
+    print(f"{'entries':>10}  {'jsonl ms/call':>14}  {'legacy ms/call':>15}")
+    for size, jsonl_ms, legacy_ms in rows:
+        legacy = f"{legacy_ms:15.3f}" if legacy_ms is not None else f"{'(skipped)':>15}"
+        print(f"{size:>10}  {jsonl_ms:14.3f}  {legacy}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
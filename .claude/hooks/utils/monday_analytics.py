@@ -0,0 +1,473 @@
+#!/usr/bin/env -S uv run --script
+# /// script
+# requires-python = ">=3.8"
+# dependencies = []
+# ///
+"""
+Columnar, streaming analytics core for the Monday.com reports.
+
+/monday_priorities, /monday_workload and /monday_expense_report each walked
+the item dicts themselves and re-parsed the same dates, statuses, people
+and money values. ItemTable parses one board's items into typed columns
+exactly once; the report reducers then run as whole-column operations over
+it:
+
+- PriorityRanking  score = priority + status + due-date urgency, top-k via
+                   a bounded heap
+- WorkloadRollup   per-person items, open items, effort points, overdue
+                   items, completion rate and balance ratio
+- ExpenseRollup    Decimal totals and counts per category
+
+``analyze_boards()`` feeds boards one at a time and drops each table once
+the reducers have consumed it, so memory is bounded by the largest board
+plus the reducers' state rather than by the whole export.
+
+Scoring follows the documented rules: priority Critical 100, Urgent 80,
+High 60, Medium 40, Low 10; status Blocked/Stuck +50, In Progress +30,
+Completed -100; due Overdue +200, Today +150, This Week +100.
+
+Command line:
+
+    uv run .claude/hooks/utils/monday_analytics.py bench [--sizes 400,40000,400000]
+"""
+
+import argparse
+import heapq
+import random
+import re
+import sys
+import time
+from datetime import date, datetime, timedelta
+from decimal import Decimal, InvalidOperation
+
+
+PRIORITY_POINTS = {"critical": 100, "urgent": 80, "high": 60, "medium": 40, "low": 10}
+STATUS_POINTS = {
+    "blocked": 50, "stuck": 50,
+    "in progress": 30, "working on it": 30,
+    "done": -100, "completed": -100, "complete": -100,
+}
+DONE_STATUSES = {"done", "completed", "complete"}
+OVERDUE_POINTS, TODAY_POINTS, WEEK_POINTS = 200, 150, 100
+NO_DATE = -1
+UNASSIGNED = "Unassigned"
+UNCATEGORIZED = "Uncategorized"
+
+_AMOUNT_TITLES = re.compile(r"amount|cost|expense|price|total|spend", re.I)
+_EFFORT_TITLES = re.compile(r"effort|points|estimate|hours", re.I)
+_CATEGORY_TITLES = re.compile(r"category|type", re.I)
+_DATE_PATTERN = re.compile(r"\d{4}-\d{2}-\d{2}")
+_MONEY_STRIP = re.compile(r"[^\d.\-]")
+
+
+def parse_date_string(text):
+    """Last YYYY-MM-DD in ``text`` as a date ordinal, or NO_DATE."""
+    if not text:
+        return NO_DATE
+    found = _DATE_PATTERN.findall(str(text))
+    if not found:
+        return NO_DATE
+    try:
+        # Timelines read "start - end"; the end is the due date.
+        return datetime.strptime(found[-1], "%Y-%m-%d").date().toordinal()
+    except ValueError:
+        return NO_DATE
+
+
+def parse_money(text):
+    """Decimal from text like "$1,234.50", or None."""
+    if text is None or text == "":
+        return None
+    cleaned = _MONEY_STRIP.sub("", str(text))
+    if not cleaned or cleaned in ("-", "."):
+        return None
+    try:
+        return Decimal(cleaned)
+    except InvalidOperation:
+        return None
+
+
+def normalize_label(text):
+    """Lowercase label without emoji or trailing decoration ("Critical ⚠️" -> "critical")."""
+    return re.sub(r"[^a-z ]", "", str(text or "").lower()).strip()
+
+
+def column_roles(columns):
+    """Map column id -> role from a board's column definitions."""
+    roles = {}
+    taken = set()
+
+    def assign(column_id, role):
+        if role not in taken:
+            roles[column_id] = role
+            taken.add(role)
+
+    for column in columns or []:
+        ctype, title, cid = column.get("type"), column.get("title") or "", column.get("id")
+        if ctype in ("status", "color"):
+            assign(cid, "priority" if "priority" in title.lower() else "status")
+        elif ctype == "date" and ("due" in title.lower() or "deadline" in title.lower()):
+            assign(cid, "due")
+        elif ctype in ("people", "multiple-person"):
+            assign(cid, "people")
+        elif ctype in ("numbers", "numeric") and _AMOUNT_TITLES.search(title):
+            assign(cid, "amount")
+        elif ctype in ("numbers", "numeric") and _EFFORT_TITLES.search(title):
+            assign(cid, "effort")
+        elif ctype in ("dropdown", "text") and _CATEGORY_TITLES.search(title):
+            assign(cid, "category")
+    # Fall back to any date or timeline column for due dates.
+    for column in columns or []:
+        if column.get("type") in ("date", "timeline"):
+            assign(column.get("id"), "due")
+    return roles
+
+
+class ItemTable:
+    """One board's items as parallel, already-parsed columns."""
+
+    __slots__ = (
+        "board", "ids", "names", "priority", "status", "due", "people",
+        "amount", "effort", "category",
+    )
+
+    def __init__(self, board_name):
+        self.board = board_name
+        self.ids, self.names = [], []
+        self.priority, self.status, self.due = [], [], []
+        self.people, self.amount, self.effort, self.category = [], [], [], []
+
+    def __len__(self):
+        return len(self.ids)
+
+    @classmethod
+    def from_board(cls, board, items):
+        table = cls(board.get("name", ""))
+        roles = column_roles(board.get("columns"))
+        # Parse each distinct raw value once; boards repeat the same dates,
+        # labels and names across many items.
+        date_cache, label_cache, people_cache = {}, {}, {}
+
+        for item in items:
+            raw = {"priority": "", "status": "", "due": "", "people": "", "amount": None,
+                   "effort": None, "category": ""}
+            for value in item.get("column_values") or []:
+                role = roles.get(value.get("id"))
+                if role is not None:
+                    raw[role] = value.get("text")
+
+            due = raw["due"] or ""
+            if due not in date_cache:
+                date_cache[due] = parse_date_string(due)
+            people = raw["people"] or ""
+            if people not in people_cache:
+                people_cache[people] = tuple(
+                    p.strip() for p in people.split(",") if p.strip()
+                ) or (UNASSIGNED,)
+            for key in ("priority", "status"):
+                label = raw[key] or ""
+                if label not in label_cache:
+                    label_cache[label] = normalize_label(label)
+
+            table.ids.append(str(item.get("id")))
+            table.names.append(item.get("name", ""))
+            table.priority.append(label_cache[raw["priority"] or ""])
+            table.status.append(label_cache[raw["status"] or ""])
+            table.due.append(date_cache[due])
+            table.people.append(people_cache[people])
+            table.amount.append(parse_money(raw["amount"]))
+            effort = parse_money(raw["effort"])
+            table.effort.append(float(effort) if effort is not None else 1.0)
+            table.category.append((raw["category"] or "").strip() or UNCATEGORIZED)
+        return table
+
+    def scores(self, today):
+        """Priority score column for ``today`` (a date ordinal)."""
+        week = today + 7
+        due_points = [
+            0 if d == NO_DATE
+            else OVERDUE_POINTS if d < today
+            else TODAY_POINTS if d == today
+            else WEEK_POINTS if d <= week
+            else 0
+            for d in self.due
+        ]
+        return [
+            PRIORITY_POINTS.get(p, 0) + STATUS_POINTS.get(s, 0) + u
+            for p, s, u in zip(self.priority, self.status, due_points)
+        ]
+
+    def done_mask(self):
+        return [s in DONE_STATUSES for s in self.status]
+
+
+class PriorityRanking:
+    """Streaming top-k by score, ties broken by board then item id."""
+
+    def __init__(self, limit, include_completed=False):
+        self.limit = limit
+        self.include_completed = include_completed
+        self.top = []  # best ``limit`` candidates seen so far, in rank order
+
+    def consume(self, table, today):
+        done = table.done_mask()
+        candidates = (
+            (score, table.board, item_id, name)
+            for score, item_id, name, is_done in zip(table.scores(today), table.ids, table.names, done)
+            if self.include_completed or not is_done
+        )
+        best = heapq.nsmallest(self.limit, candidates, key=lambda c: (-c[0], c[1], c[2]))
+        self.top = heapq.nsmallest(
+            self.limit, self.top + best, key=lambda c: (-c[0], c[1], c[2])
+        )
+
+    def result(self):
+        return [
+            {"score": score, "board": board, "id": item_id, "name": name}
+            for score, board, item_id, name in self.top
+        ]
+
+
+class WorkloadRollup:
+    """Per-person totals; multi-person items count towards everyone assigned."""
+
+    def __init__(self):
+        self.people = {}
+
+    def consume(self, table, today):
+        for people, effort, due, is_done in zip(table.people, table.effort, table.due, table.done_mask()):
+            for person in people:
+                stats = self.people.get(person)
+                if stats is None:
+                    stats = self.people[person] = {"items": 0, "open": 0, "effort": 0.0, "overdue": 0}
+                stats["items"] += 1
+                if not is_done:
+                    stats["open"] += 1
+                    stats["effort"] += effort
+                    if due != NO_DATE and due < today:
+                        stats["overdue"] += 1
+
+    def result(self):
+        assigned = [s["effort"] for p, s in self.people.items() if p != UNASSIGNED]
+        mean = sum(assigned) / len(assigned) if assigned else 0.0
+        report = {}
+        for person in sorted(self.people):
+            stats = dict(self.people[person])
+            stats["effort"] = round(stats["effort"], 2)
+            stats["completion_rate"] = round(1 - stats["open"] / stats["items"], 4)
+            stats["balance_ratio"] = round(stats["effort"] / mean, 4) if mean else 0.0
+            report[person] = stats
+        return report
+
+
+class ExpenseRollup:
+    """Decimal totals per category; items without an amount are skipped."""
+
+    def __init__(self):
+        self.categories = {}
+
+    def consume(self, table, today):
+        for amount, category in zip(table.amount, table.category):
+            if amount is None:
+                continue
+            total, count = self.categories.get(category, (Decimal(0), 0))
+            self.categories[category] = (total + amount, count + 1)
+
+    def result(self):
+        categories = {
+            name: {"total": str(total), "count": count}
+            for name, (total, count) in sorted(self.categories.items())
+        }
+        grand = sum((total for total, _ in self.categories.values()), Decimal(0))
+        return {"categories": categories, "total": str(grand)}
+
+
+def analyze_boards(boards, today=None, limit=20, include_completed=False):
+    """
+    Run all three reports over ``boards`` in one pass.
+
+    ``boards`` yields ``(board, items)`` pairs and may be a generator that
+    fetches each board lazily; only one board's table is alive at a time.
+    """
+    today = (today or date.today()).toordinal()
+    ranking = PriorityRanking(limit, include_completed)
+    workload = WorkloadRollup()
+    expenses = ExpenseRollup()
+    for board, items in boards:
+        table = ItemTable.from_board(board, items)
+        for reducer in (ranking, workload, expenses):
+            reducer.consume(table, today)
+    return {
+        "priorities": ranking.result(),
+        "workload": workload.result(),
+        "expenses": expenses.result(),
+    }
+
+
+# ------------------------------------------------------------ benchmark
+
+
+def reference_reports(boards, today=None, limit=20, include_completed=False):
+    """
+    The per-command pattern: each report walks every item dict and parses
+    column values itself. Used by the benchmark to check identical output.
+    """
+    boards = list(boards)
+    today = (today or date.today()).toordinal()
+
+    roles_by_board = {id(board): column_roles(board.get("columns")) for board, _ in boards}
+
+    def value(board, item, role):
+        roles = roles_by_board[id(board)]
+        for v in item.get("column_values") or []:
+            if roles.get(v.get("id")) == role:
+                return v.get("text")
+        return None
+
+    ranked = []
+    for board, items in boards:
+        for item in items:
+            status = normalize_label(value(board, item, "status"))
+            if status in DONE_STATUSES and not include_completed:
+                continue
+            score = PRIORITY_POINTS.get(normalize_label(value(board, item, "priority")), 0)
+            score += STATUS_POINTS.get(status, 0)
+            due = parse_date_string(value(board, item, "due"))
+            if due != NO_DATE:
+                if due < today:
+                    score += OVERDUE_POINTS
+                elif due == today:
+                    score += TODAY_POINTS
+                elif due <= today + 7:
+                    score += WEEK_POINTS
+            ranked.append((score, board.get("name", ""), str(item.get("id")), item.get("name", "")))
+    ranked.sort(key=lambda c: (-c[0], c[1], c[2]))
+    priorities = [
+        {"score": s, "board": b, "id": i, "name": n} for s, b, i, n in ranked[:limit]
+    ]
+
+    people = {}
+    for board, items in boards:
+        for item in items:
+            names = [p.strip() for p in (value(board, item, "people") or "").split(",") if p.strip()]
+            done = normalize_label(value(board, item, "status")) in DONE_STATUSES
+            effort = parse_money(value(board, item, "effort"))
+            effort = float(effort) if effort is not None else 1.0
+            due = parse_date_string(value(board, item, "due"))
+            for person in names or [UNASSIGNED]:
+                stats = people.setdefault(person, {"items": 0, "open": 0, "effort": 0.0, "overdue": 0})
+                stats["items"] += 1
+                if not done:
+                    stats["open"] += 1
+                    stats["effort"] += effort
+                    if due != NO_DATE and due < today:
+                        stats["overdue"] += 1
+    assigned = [s["effort"] for p, s in people.items() if p != UNASSIGNED]
+    mean = sum(assigned) / len(assigned) if assigned else 0.0
+    workload = {}
+    for person in sorted(people):
+        stats = dict(people[person])
+        stats["effort"] = round(stats["effort"], 2)
+        stats["completion_rate"] = round(1 - stats["open"] / stats["items"], 4)
+        stats["balance_ratio"] = round(stats["effort"] / mean, 4) if mean else 0.0
+        workload[person] = stats
+
+    categories = {}
+    for board, items in boards:
+        for item in items:
+            amount = parse_money(value(board, item, "amount"))
+            if amount is None:
+                continue
+            category = (value(board, item, "category") or "").strip() or UNCATEGORIZED
+            total, count = categories.get(category, (Decimal(0), 0))
+            categories[category] = (total + amount, count + 1)
+    expenses = {
+        "categories": {
+            name: {"total": str(total), "count": count}
+            for name, (total, count) in sorted(categories.items())
+        },
+        "total": str(sum((t for t, _ in categories.values()), Decimal(0))),
+    }
+    return {"priorities": priorities, "workload": workload, "expenses": expenses}
+
+
+BENCH_COLUMNS = [
+    {"id": "status", "title": "Status", "type": "status"},
+    {"id": "priority", "title": "Priority", "type": "status"},
+    {"id": "due", "title": "Due Date", "type": "date"},
+    {"id": "person", "title": "Person", "type": "people"},
+    {"id": "cost", "title": "Amount", "type": "numbers"},
+    {"id": "effort", "title": "Effort Points", "type": "numbers"},
+    {"id": "category", "title": "Category", "type": "dropdown"},
+]
+
+
+def synthetic_boards(total_items, per_board=400, seed=7, today=None):
+    """Yield (board, items) pairs lazily, ``per_board`` items at a time."""
+    rng = random.Random(seed)
+    today = today or date.today()
+    people = [f"Person {i}" for i in range(12)]
+    statuses = ["Working on it", "Stuck", "Done", "Not Started", ""]
+    priorities = ["Critical ⚠️", "High", "Medium", "Low", ""]
+    categories = ["Materials", "Labor", "Permits", "Equipment", ""]
+    for b in range(0, total_items, per_board):
+        board = {"id": str(b), "name": f"Board {b // per_board:05d}", "columns": BENCH_COLUMNS}
+        items = []
+        for i in range(b, min(b + per_board, total_items)):
+            due = today + timedelta(days=rng.randint(-20, 40))
+            assignees = ", ".join(rng.sample(people, rng.choice([0, 1, 1, 2])))
+            amount = rng.choice(["", f"{rng.randint(10, 9999)}.{rng.randint(0, 99):02d}", "$1,250.00"])
+            items.append(
+                {
+                    "id": str(i),
+                    "name": f"Item {i}",
+                    "column_values": [
+                        {"id": "status", "text": rng.choice(statuses)},
+                        {"id": "priority", "text": rng.choice(priorities)},
+                        {"id": "due", "text": due.isoformat() if rng.random() > 0.1 else ""},
+                        {"id": "person", "text": assignees},
+                        {"id": "cost", "text": amount},
+                        {"id": "effort", "text": str(rng.choice([1, 2, 3, 5, 8]))},
+                        {"id": "category", "text": rng.choice(categories)},
+                    ],
+                }
+            )
+        yield board, items
+
+
+def run_benchmark(sizes, limit=20):
+    rows = []
+    today = date.today()
+    for size in sizes:
+        boards = list(synthetic_boards(size, today=today))
+        start = time.perf_counter()
+        columnar = analyze_boards(boards, today=today, limit=limit)
+        columnar_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        reference = reference_reports(boards, today=today, limit=limit)
+        reference_s = time.perf_counter() - start
+        del boards
+
+        rows.append((size, reference_s, columnar_s, columnar == reference))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Monday.com report analytics core")
+    sub = parser.add_subparsers(dest="command", required=True)
+    bench = sub.add_parser("bench", help="Columnar core vs per-command item loops")
+    bench.add_argument("--sizes", default="400,40000,400000")
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    print(f"{'items':>8}  {'loops s':>8}  {'columnar s':>10}  {'speedup':>7}  identical")
+    ok = True
+    for size, reference_s, columnar_s, identical in run_benchmark(sizes):
+        ok = ok and identical
+        print(f"{size:>8}  {reference_s:8.2f}  {columnar_s:10.2f}  {reference_s / columnar_s:6.1f}x  {identical}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,519 @@
+#!/usr/bin/env -S uv run --script
+# /// script
+# requires-python = ">=3.8"
+# dependencies = []
+# ///
+"""
+SQLite read-through cache with delta sync for the Monday.com API client.
+
+Running /monday_daily_report, /monday_priorities and /monday_workload back
+to back used to fetch the same boards, groups, columns and items three
+times. MondayCache sits in front of the client's GraphQL call and keeps
+boards and items in a local SQLite database with their ``updated_at``:
+
+- Boards (with groups and columns) are cached for ``boards_ttl`` seconds.
+- Items for a board are fully loaded once, then refreshed incrementally
+  after ``items_ttl`` by asking only for items updated since the last sync
+  (``__last_updated__`` rule, day granularity, so the overlap is re-fetched
+  and upserted).
+- A full reload happens after ``full_ttl`` or when the board's
+  ``items_count``, fetched fresh with the delta query, no longer matches
+  the cache (items deleted or archived).
+- ``refresh=True`` (the commands' ``--refresh`` flag) bypasses the cache.
+
+The cache wraps any ``execute(query, variables) -> data`` callable, so
+monday_api.py passes in its own request method and keeps its complexity
+budget handling and retries.
+
+Usage:
+
+    from utils.monday_cache import MondayCache
+    cache = MondayCache(client.execute_query, refresh=args.refresh)
+    boards = cache.get_boards()
+    items = cache.get_items(board_id)
+
+Command line:
+
+    uv run .claude/hooks/utils/monday_cache.py stats|clear
+    uv run .claude/hooks/utils/monday_cache.py simulate [--boards 25] [--gap 60] [--fixture file.json]
+"""
+
+import argparse
+import json
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+
+DEFAULT_DB = Path(
+    os.environ.get("MONDAY_CACHE_PATH", Path.home() / ".claude" / "data" / "monday_cache.sqlite")
+)
+BOARDS_TTL = int(os.environ.get("MONDAY_CACHE_BOARDS_TTL", 3600))
+ITEMS_TTL = int(os.environ.get("MONDAY_CACHE_ITEMS_TTL", 300))
+FULL_TTL = int(os.environ.get("MONDAY_CACHE_FULL_TTL", 24 * 3600))
+PAGE_LIMIT = 100
+
+BOARDS_QUERY = """
+query ($page: Int!, $limit: Int!) {
+  complexity { query before after reset_in_x_seconds }
+  boards (page: $page, limit: $limit) {
+    id name description state updated_at items_count
+    groups { id title color }
+    columns { id title type settings_str }
+  }
+}"""
+
+ITEM_FIELDS = """
+    id name state created_at updated_at
+    group { id title }
+    column_values { id type text value }"""
+
+ITEMS_QUERY = """
+query ($board_id: [ID!], $limit: Int!, $query_params: ItemsQuery) {
+  complexity { query before after reset_in_x_seconds }
+  boards (ids: $board_id) {
+    items_count
+    items_page (limit: $limit, query_params: $query_params) {
+      cursor
+      items {%s
+      }
+    }
+  }
+}""" % ITEM_FIELDS
+
+NEXT_ITEMS_QUERY = """
+query ($cursor: String!, $limit: Int!) {
+  complexity { query before after reset_in_x_seconds }
+  next_items_page (cursor: $cursor, limit: $limit) {
+    cursor
+    items {%s
+    }
+  }
+}""" % ITEM_FIELDS
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS boards (
+    id TEXT PRIMARY KEY,
+    name TEXT,
+    updated_at TEXT,
+    items_count INTEGER,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS items (
+    id TEXT PRIMARY KEY,
+    board_id TEXT NOT NULL,
+    updated_at TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS items_board ON items (board_id);
+CREATE TABLE IF NOT EXISTS sync_state (
+    key TEXT PRIMARY KEY,
+    full_sync REAL,
+    last_sync REAL,
+    full_calls INTEGER,
+    full_complexity INTEGER
+);
+CREATE TABLE IF NOT EXISTS stats (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+STAT_NAMES = ("api_calls", "complexity_used", "calls_saved", "complexity_saved")
+
+
+class MondayCache:
+    """Read-through cache for boards and items, keyed by board id."""
+
+    def __init__(
+        self,
+        execute,
+        db_path=DEFAULT_DB,
+        boards_ttl=BOARDS_TTL,
+        items_ttl=ITEMS_TTL,
+        full_ttl=FULL_TTL,
+        refresh=False,
+        clock=time.time,
+    ):
+        self.execute = execute
+        self.boards_ttl = boards_ttl
+        self.items_ttl = items_ttl
+        self.full_ttl = full_ttl
+        self.refresh = refresh
+        self.clock = clock
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(str(db_path))
+        self.db.executescript(SCHEMA)
+        # Counters for this process; cumulative totals live in the stats table.
+        self.session = dict.fromkeys(STAT_NAMES, 0)
+
+    # ------------------------------------------------------------ API calls
+
+    def _call(self, query, variables, cost):
+        data = self.execute(query, variables) or {}
+        complexity = (data.get("complexity") or {}).get("query") or 0
+        cost["calls"] += 1
+        cost["complexity"] += complexity
+        return data
+
+    def _record(self, used, saved):
+        for name, value in (
+            ("api_calls", used["calls"]),
+            ("complexity_used", used["complexity"]),
+            ("calls_saved", saved["calls"]),
+            ("complexity_saved", saved["complexity"]),
+        ):
+            if value:
+                self.session[name] += value
+                self.db.execute(
+                    "INSERT INTO stats (name, value) VALUES (?, ?) "
+                    "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+                    (name, value),
+                )
+
+    def _sync_state(self, key):
+        row = self.db.execute(
+            "SELECT full_sync, last_sync, full_calls, full_complexity FROM sync_state WHERE key = ?",
+            (key,),
+        ).fetchone()
+        if row is None:
+            return None
+        return dict(zip(("full_sync", "last_sync", "full_calls", "full_complexity"), row))
+
+    def _saved(self, state, used):
+        return {
+            "calls": max((state or {}).get("full_calls", 0) - used["calls"], 0),
+            "complexity": max((state or {}).get("full_complexity", 0) - used["complexity"], 0),
+        }
+
+    # ------------------------------------------------------------ boards
+
+    def get_boards(self):
+        """All boards with groups and columns."""
+        now = self.clock()
+        state = self._sync_state("boards")
+        if not self.refresh and state and now - state["last_sync"] < self.boards_ttl:
+            zero = {"calls": 0, "complexity": 0}
+            with self.db:
+                self._record(zero, self._saved(state, zero))
+            return self._cached_boards()
+
+        cost = {"calls": 0, "complexity": 0}
+        boards, page = [], 1
+        while True:
+            data = self._call(BOARDS_QUERY, {"page": page, "limit": PAGE_LIMIT}, cost)
+            batch = data.get("boards") or []
+            boards.extend(batch)
+            if len(batch) < PAGE_LIMIT:
+                break
+            page += 1
+
+        with self.db:
+            self.db.execute("DELETE FROM boards")
+            self.db.executemany(
+                "INSERT INTO boards (id, name, updated_at, items_count, data) VALUES (?, ?, ?, ?, ?)",
+                [
+                    (str(b["id"]), b.get("name"), b.get("updated_at"), b.get("items_count"), json.dumps(b))
+                    for b in boards
+                ],
+            )
+            self._save_state("boards", now, now, cost)
+            self._record(cost, {"calls": 0, "complexity": 0})
+        return boards
+
+    def _cached_boards(self):
+        rows = self.db.execute("SELECT data FROM boards ORDER BY rowid").fetchall()
+        return [json.loads(data) for (data,) in rows]
+
+    def _save_state(self, key, full_sync, last_sync, full_cost):
+        self.db.execute(
+            "INSERT INTO sync_state (key, full_sync, last_sync, full_calls, full_complexity) "
+            "VALUES (?, ?, ?, ?, ?) ON CONFLICT(key) DO UPDATE SET "
+            "full_sync = excluded.full_sync, last_sync = excluded.last_sync, "
+            "full_calls = excluded.full_calls, full_complexity = excluded.full_complexity",
+            (key, full_sync, last_sync, full_cost["calls"], full_cost["complexity"]),
+        )
+
+    # ------------------------------------------------------------ items
+
+    def get_items(self, board_id):
+        """All items on a board, syncing only what changed when possible."""
+        board_id = str(board_id)
+        key = f"items:{board_id}"
+        now = self.clock()
+        state = self._sync_state(key)
+        zero = {"calls": 0, "complexity": 0}
+
+        full = self.refresh or state is None or now - state["full_sync"] >= self.full_ttl
+        if not full and now - state["last_sync"] < self.items_ttl:
+            with self.db:
+                self._record(zero, self._saved(state, zero))
+            return self._cached_items(board_id)
+
+        cost = {"calls": 0, "complexity": 0}
+        if not full:
+            since = datetime.fromtimestamp(state["last_sync"], timezone.utc).strftime("%Y-%m-%d")
+            query_params = {
+                "rules": [
+                    {
+                        "column_id": "__last_updated__",
+                        "compare_value": ["EXACT", since],
+                        "operator": "greater_than_or_equals",
+                        "compare_attribute": "UPDATED_AT",
+                    }
+                ]
+            }
+            changed, items_count = self._fetch_items(board_id, query_params, cost)
+            with self.db:
+                self._upsert_items(board_id, changed)
+                if items_count is not None:
+                    self.db.execute(
+                        "UPDATE boards SET items_count = ? WHERE id = ?", (items_count, board_id)
+                    )
+            if self._count_mismatch(board_id, items_count):
+                full = True
+            else:
+                with self.db:
+                    self.db.execute(
+                        "UPDATE sync_state SET last_sync = ? WHERE key = ?", (now, key)
+                    )
+                    self._record(cost, self._saved(state, cost))
+                return self._cached_items(board_id)
+
+        items, _ = self._fetch_items(board_id, None, cost)
+        with self.db:
+            self.db.execute("DELETE FROM items WHERE board_id = ?", (board_id,))
+            self._upsert_items(board_id, items)
+            self._save_state(key, now, now, cost)
+            self._record(cost, {"calls": 0, "complexity": 0})
+        return self._cached_items(board_id)
+
+    def _fetch_items(self, board_id, query_params, cost):
+        """Return ``(items, items_count)``; the count is the board's current total."""
+        variables = {"board_id": [board_id], "limit": PAGE_LIMIT, "query_params": query_params}
+        data = self._call(ITEMS_QUERY, variables, cost)
+        board = (data.get("boards") or [{}])[0] or {}
+        items_count = board.get("items_count")
+        page = board.get("items_page") or {}
+        items = list(page.get("items") or [])
+        cursor = page.get("cursor")
+        while cursor:
+            data = self._call(NEXT_ITEMS_QUERY, {"cursor": cursor, "limit": PAGE_LIMIT}, cost)
+            page = data.get("next_items_page") or {}
+            items.extend(page.get("items") or [])
+            cursor = page.get("cursor")
+        return items, items_count
+
+    def _upsert_items(self, board_id, items):
+        self.db.executemany(
+            "INSERT INTO items (id, board_id, updated_at, data) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(id) DO UPDATE SET board_id = excluded.board_id, "
+            "updated_at = excluded.updated_at, data = excluded.data",
+            [(str(i["id"]), board_id, i.get("updated_at"), json.dumps(i)) for i in items],
+        )
+
+    def _count_mismatch(self, board_id, items_count):
+        if items_count is None:
+            return False
+        (cached,) = self.db.execute(
+            "SELECT COUNT(*) FROM items WHERE board_id = ?", (board_id,)
+        ).fetchone()
+        return cached != items_count
+
+    def _cached_items(self, board_id):
+        rows = self.db.execute(
+            "SELECT data FROM items WHERE board_id = ? ORDER BY rowid", (board_id,)
+        ).fetchall()
+        return [json.loads(data) for (data,) in rows]
+
+    # ------------------------------------------------------------ maintenance
+
+    def stats(self):
+        totals = dict.fromkeys(STAT_NAMES, 0)
+        totals.update(dict(self.db.execute("SELECT name, value FROM stats").fetchall()))
+        return totals
+
+    def clear(self):
+        with self.db:
+            for table in ("boards", "items", "sync_state", "stats"):
+                self.db.execute(f"DELETE FROM {table}")
+
+    def close(self):
+        self.db.close()
+
+
+class FixtureTransport:
+    """
+    Stand-in for the Monday GraphQL endpoint backed by fixture data.
+
+    Answers the three queries above from ``{"boards": [{..., "items": [...]}]}``,
+    honours pagination and the ``__last_updated__`` rule, and charges a
+    complexity cost per call so savings can be measured without a token.
+    """
+
+    def __init__(self, fixture):
+        self.boards = {str(b["id"]): b for b in fixture["boards"]}
+        self.cursors = {}
+        self.calls = 0
+
+    def __call__(self, query, variables):
+        self.calls += 1
+        if query == BOARDS_QUERY:
+            start = (variables["page"] - 1) * variables["limit"]
+            page = list(self.boards.values())[start:start + variables["limit"]]
+            boards = [
+                dict({k: v for k, v in b.items() if k != "items"}, items_count=len(b["items"]))
+                for b in page
+            ]
+            return {"complexity": {"query": 1000 + 300 * len(boards)}, "boards": boards}
+
+        if query == ITEMS_QUERY:
+            board = self.boards[variables["board_id"][0]]
+            items = board["items"]
+            params = variables.get("query_params") or {}
+            for rule in params.get("rules", []):
+                since = rule["compare_value"][1]
+                items = [i for i in items if i["updated_at"][:10] >= since]
+            return {
+                "complexity": {"query": 500},
+                "boards": [
+                    {"items_count": len(board["items"]), "items_page": self._page(items, variables["limit"])}
+                ],
+            }
+
+        if query == NEXT_ITEMS_QUERY:
+            items = self.cursors.pop(variables["cursor"])
+            return {"complexity": {"query": 500}, "next_items_page": self._page(items, variables["limit"])}
+
+        raise ValueError("FixtureTransport: unknown query")
+
+    def _page(self, items, limit):
+        cursor = None
+        if len(items) > limit:
+            cursor = f"cursor-{len(self.cursors)}-{random.random()}"
+            self.cursors[cursor] = items[limit:]
+        return {"cursor": cursor, "items": [dict(i) for i in items[:limit]]}
+
+
+def synthetic_fixture(board_count=25, items_per_board=16, seed=7):
+    rng = random.Random(seed)
+    base = datetime(2025, 9, 1, tzinfo=timezone.utc)
+    boards = []
+    for b in range(board_count):
+        items = []
+        for i in range(items_per_board):
+            updated = base + timedelta(days=rng.randint(0, 20))
+            items.append(
+                {
+                    "id": f"{b}{i:05d}",
+                    "name": f"Task {i} on board {b}",
+                    "state": "active",
+                    "created_at": base.isoformat(),
+                    "updated_at": updated.isoformat(),
+                    "group": {"id": "topics", "title": "To-Dos"},
+                    "column_values": [
+                        {"id": "status", "type": "status", "text": rng.choice(["Working on it", "Done", "Stuck"]), "value": None},
+                        {"id": "date4", "type": "date", "text": "2025-10-01", "value": None},
+                    ],
+                }
+            )
+        boards.append(
+            {
+                "id": str(9000000000 + b),
+                "name": f"Board {b}",
+                "description": None,
+                "state": "active",
+                "updated_at": base.isoformat(),
+                "groups": [{"id": "topics", "title": "To-Dos", "color": "#579bfc"}],
+                "columns": [{"id": "status", "title": "Status", "type": "status", "settings_str": "{}"}],
+                "items": items,
+            }
+        )
+    return {"boards": boards}
+
+
+def simulate(fixture, runs=("daily_report", "priorities", "workload"), gap=60):
+    """
+    Run each command's fetch pattern back to back, with and without cache.
+
+    Between runs ``gap`` seconds pass and one item per board is edited. Runs
+    inside the items TTL are served from the cache; a ``gap`` above it
+    exercises the delta path instead.
+    """
+    results = []
+    for cached in (False, True):
+        transport = FixtureTransport(json.loads(json.dumps(fixture)))
+        clock = [datetime(2025, 9, 22, tzinfo=timezone.utc).timestamp()]
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = MondayCache(transport, db_path=Path(tmp) / "cache.sqlite", clock=lambda: clock[0])
+            complexity = 0
+            for n, name in enumerate(runs):
+                before = transport.calls
+                cache.refresh = not cached
+                used_before = cache.session["complexity_used"]
+                total = 0
+                for board in cache.get_boards():
+                    total += len(cache.get_items(board["id"]))
+                used = cache.session["complexity_used"] - used_before
+                complexity += used
+                results.append((cached, name, transport.calls - before, used, total))
+
+                clock[0] += gap
+                stamp = datetime.fromtimestamp(clock[0], timezone.utc).isoformat()
+                for board in transport.boards.values():
+                    board["items"][n % len(board["items"])]["updated_at"] = stamp
+            stats = cache.stats()
+            cache.close()
+        results.append((cached, "total", None, complexity, stats))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Monday.com API cache")
+    parser.add_argument("--db", default=str(DEFAULT_DB))
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("stats", help="Calls and complexity points used and saved")
+    sub.add_parser("clear", help="Drop all cached data")
+    sim = sub.add_parser("simulate", help="Daily report + priorities + workload against a fixture")
+    sim.add_argument("--boards", type=int, default=25)
+    sim.add_argument("--items", type=int, default=16)
+    sim.add_argument("--gap", type=int, default=60, help="Seconds between commands")
+    sim.add_argument("--fixture", help="JSON file of {'boards': [{..., 'items': [...]}]}")
+    args = parser.parse_args()
+
+    if args.command in ("stats", "clear"):
+        cache = MondayCache(execute=None, db_path=args.db)
+        if args.command == "clear":
+            cache.clear()
+            print(f"Cleared {args.db}")
+        else:
+            for name, value in cache.stats().items():
+                print(f"{name:>18}: {value}")
+        cache.close()
+        return 0
+
+    if args.fixture:
+        with open(args.fixture) as f:
+            fixture = json.load(f)
+    else:
+        fixture = synthetic_fixture(args.boards, args.items)
+
+    print(f"{'mode':<9}  {'run':<13}  {'api calls':>9}  {'complexity':>10}  {'items':>6}")
+    for cached, name, calls, complexity, extra in simulate(fixture, gap=args.gap):
+        mode = "cached" if cached else "uncached"
+        if name == "total":
+            print(f"{mode:<9}  {'total':<13}  {'':>9}  {complexity:>10}")
+            if cached:
+                print(f"saved: {extra['calls_saved']} calls, {extra['complexity_saved']} complexity points")
+            continue
+        print(f"{mode:<9}  {name:<13}  {calls:>9}  {complexity:>10}  {extra:>6}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,450 @@
+#!/usr/bin/env -S uv run --script
+# /// script
+# requires-python = ">=3.8"
+# dependencies = []
+# ///
+"""
+Concurrent, complexity-budget-aware request scheduler for the Monday.com API.
+
+Paging through boards and items one request at a time leaves a full export
+bound by round-trip latency rather than by the API's complexity budget.
+MondayScheduler runs board and cursor-page fetches on a bounded thread
+pool and:
+
+- batches several boards into one ``boards(ids: [...])`` query while their
+  estimated combined complexity stays under ``max_query_complexity``;
+- follows each board's ``next_items_page`` cursor as soon as the page that
+  produced it returns, in parallel with other boards;
+- reads ``complexity { before after reset_in_x_seconds }`` from every
+  response and reserves each request's estimated cost up front, waiting
+  for the budget window to reset instead of reacting to 429s. A
+  ``BudgetExhausted`` error is still honoured as a fallback.
+
+Like MondayCache, it wraps an ``execute(query, variables) -> data``
+callable, so monday_api.py keeps its transport and error handling.
+
+Usage:
+
+    from utils.monday_scheduler import MondayScheduler
+    items_by_board = MondayScheduler(client.execute_query).fetch_items(board_ids)
+
+Command line:
+
+    uv run .claude/hooks/utils/monday_scheduler.py bench [--boards 1,25,250] [--latency 0.05]
+"""
+
+import argparse
+import json
+import math
+import random
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib import request as urlrequest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from monday_cache import ITEM_FIELDS, ITEMS_QUERY, NEXT_ITEMS_QUERY  # noqa: E402
+
+
+MAX_WORKERS = 8
+PAGE_LIMIT = 100
+MAX_QUERY_COMPLEXITY = 2_000_000
+MAX_BATCH_BOARDS = 10
+INITIAL_BOARD_ESTIMATE = 1_000
+
+BATCH_ITEMS_QUERY = """
+query ($ids: [ID!], $limit: Int!) {
+  complexity { query before after reset_in_x_seconds }
+  boards (ids: $ids) {
+    id
+    items_page (limit: $limit) {
+      cursor
+      items {%s
+      }
+    }
+  }
+}""" % ITEM_FIELDS
+
+
+class BudgetExhausted(Exception):
+    """Raised by ``execute`` when the API rejects a call for budget reasons."""
+
+    def __init__(self, reset_in=1.0):
+        super().__init__(f"Complexity budget exhausted, resets in {reset_in}s")
+        self.reset_in = reset_in
+
+
+class ComplexityBudget:
+    """
+    Tracks the remaining complexity budget shared by all worker threads.
+
+    Costs are reserved before a request is sent and settled with the
+    response's ``complexity`` block, so concurrent requests cannot
+    overdraw the budget between responses.
+    """
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self.cond = threading.Condition()
+        self.limit = None
+        self.remaining = None
+        self.reserved = 0
+        self.reset_at = None
+        self.waited = 0.0
+
+    def acquire(self, cost):
+        with self.cond:
+            while True:
+                now = self.clock()
+                if self.reset_at is not None and now >= self.reset_at:
+                    self.remaining, self.reset_at = self.limit, None
+                if self.remaining is None or self.remaining - self.reserved >= cost or (
+                    self.reserved == 0 and self.reset_at is None
+                ):
+                    self.reserved += cost
+                    return cost
+                timeout = (self.reset_at - now) if self.reset_at is not None else None
+                started = self.clock()
+                self.cond.wait(timeout)
+                self.waited += self.clock() - started
+
+    def settle(self, reserved, complexity):
+        with self.cond:
+            self.reserved -= reserved
+            if complexity and complexity.get("after") is not None:
+                self.limit = max(self.limit or 0, complexity.get("before") or 0)
+                reset_at = self.clock() + float(complexity.get("reset_in_x_seconds") or 60)
+                if self.reset_at is None or self.remaining is None:
+                    self.remaining = complexity["after"]
+                else:
+                    # Responses can arrive out of order; keep the lower figure.
+                    self.remaining = min(self.remaining, complexity["after"])
+                self.reset_at = reset_at if self.reset_at is None else min(self.reset_at, reset_at)
+            self.cond.notify_all()
+
+    def exhausted(self, reset_in):
+        with self.cond:
+            self.remaining = 0
+            self.reset_at = self.clock() + reset_in
+            self.cond.notify_all()
+
+
+class MondayScheduler:
+    """Fetch all items for many boards with bounded concurrency."""
+
+    def __init__(
+        self,
+        execute,
+        max_workers=MAX_WORKERS,
+        page_limit=PAGE_LIMIT,
+        max_query_complexity=MAX_QUERY_COMPLEXITY,
+        max_batch_boards=MAX_BATCH_BOARDS,
+        max_retries=5,
+    ):
+        self.execute = execute
+        self.max_workers = max_workers
+        self.page_limit = page_limit
+        self.max_query_complexity = max_query_complexity
+        self.max_batch_boards = max_batch_boards
+        self.max_retries = max_retries
+        self.budget = ComplexityBudget()
+        self.board_estimate = INITIAL_BOARD_ESTIMATE
+        self.page_estimate = INITIAL_BOARD_ESTIMATE
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def _call(self, query, variables, estimate):
+        for attempt in range(self.max_retries + 1):
+            reserved = self.budget.acquire(estimate)
+            try:
+                data = self.execute(query, variables) or {}
+            except BudgetExhausted as e:
+                self.budget.settle(reserved, None)
+                self.budget.exhausted(e.reset_in)
+                if attempt == self.max_retries:
+                    raise
+                continue
+            except Exception:
+                self.budget.settle(reserved, None)
+                raise
+            with self._lock:
+                self.calls += 1
+            self.budget.settle(reserved, data.get("complexity"))
+            return data
+
+    def _learn(self, attribute, cost, units):
+        if cost and units:
+            with self._lock:
+                # Smoothed per-board / per-page cost used for batching and reservations.
+                current = getattr(self, attribute)
+                setattr(self, attribute, max(1, int(0.5 * current + 0.5 * cost / units)))
+
+    def plan_batches(self, board_ids):
+        """Group boards so each query's estimated complexity fits the cap."""
+        per_query = max(1, min(self.max_batch_boards, self.max_query_complexity // self.board_estimate))
+        # Keep at least one batch per worker so the pool is not starved.
+        per_query = min(per_query, max(1, math.ceil(len(board_ids) / self.max_workers)))
+        return [board_ids[i:i + per_query] for i in range(0, len(board_ids), per_query)]
+
+    def _first_pages(self, batch):
+        estimate = self.board_estimate * len(batch)
+        data = self._call(BATCH_ITEMS_QUERY, {"ids": batch, "limit": self.page_limit}, estimate)
+        self._learn("board_estimate", (data.get("complexity") or {}).get("query"), len(batch))
+        pages = []
+        for board in data.get("boards") or []:
+            page = board.get("items_page") or {}
+            pages.append((str(board["id"]), page.get("items") or [], page.get("cursor")))
+        return pages
+
+    def _next_page(self, board_id, cursor):
+        data = self._call(
+            NEXT_ITEMS_QUERY, {"cursor": cursor, "limit": self.page_limit}, self.page_estimate
+        )
+        self._learn("page_estimate", (data.get("complexity") or {}).get("query"), 1)
+        page = data.get("next_items_page") or {}
+        return [(board_id, page.get("items") or [], page.get("cursor"))]
+
+    def fetch_items(self, board_ids):
+        """Return ``{board_id: [items]}`` with items in API order per board."""
+        board_ids = [str(b) for b in board_ids]
+        results = {board_id: [] for board_id in board_ids}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            pending = {pool.submit(self._first_pages, batch) for batch in self.plan_batches(board_ids)}
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    for board_id, items, cursor in future.result():
+                        results[board_id].extend(items)
+                        if cursor:
+                            pending.add(pool.submit(self._next_page, board_id, cursor))
+        return results
+
+
+def sequential_fetch(execute, board_ids, page_limit=PAGE_LIMIT, max_retries=5):
+    """One request at a time with backoff only after a failure (the old path)."""
+    results = {}
+    calls = 0
+
+    def call(query, variables):
+        nonlocal calls
+        for attempt in range(max_retries + 1):
+            try:
+                calls += 1
+                return execute(query, variables) or {}
+            except BudgetExhausted as e:
+                if attempt == max_retries:
+                    raise
+                time.sleep(max(e.reset_in, 2 ** attempt * 0.1))
+
+    for board_id in board_ids:
+        data = call(ITEMS_QUERY, {"board_id": [str(board_id)], "limit": page_limit, "query_params": None})
+        page = (data.get("boards") or [{}])[0].get("items_page") or {}
+        items = list(page.get("items") or [])
+        cursor = page.get("cursor")
+        while cursor:
+            data = call(NEXT_ITEMS_QUERY, {"cursor": cursor, "limit": page_limit})
+            page = data.get("next_items_page") or {}
+            items.extend(page.get("items") or [])
+            cursor = page.get("cursor")
+        results[str(board_id)] = items
+    return results, calls
+
+
+class MockMondayServer:
+    """
+    Local HTTP stand-in for api.monday.com with latency and a complexity budget.
+
+    Each request sleeps ``latency`` seconds. Queries cost ``board_cost`` per
+    board plus ``item_cost`` per requested item slot; once ``budget`` is
+    spent within ``window`` seconds, requests get HTTP 429 until the window
+    resets.
+    """
+
+    def __init__(self, boards, latency=0.05, budget=5_000_000, window=60.0,
+                 board_cost=200, item_cost=10):
+        self.boards = boards
+        self.latency = latency
+        self.budget = budget
+        self.window = window
+        self.board_cost = board_cost
+        self.item_cost = item_cost
+        self.lock = threading.Lock()
+        self.window_start = time.monotonic()
+        self.spent = 0
+        self.cursors = {}
+        self.rejected = 0
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/v2"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _charge(self, cost):
+        with self.lock:
+            now = time.monotonic()
+            if now - self.window_start >= self.window:
+                self.window_start, self.spent = now, 0
+            reset_in = max(0.0, self.window - (now - self.window_start))
+            before = self.budget - self.spent
+            if cost > before:
+                self.rejected += 1
+                return None, reset_in
+            self.spent += cost
+            return {
+                "query": cost,
+                "before": before,
+                "after": before - cost,
+                "reset_in_x_seconds": round(reset_in, 3),
+            }, reset_in
+
+    def _page(self, items, limit):
+        cursor = None
+        if len(items) > limit:
+            with self.lock:
+                cursor = f"c{len(self.cursors)}-{random.random()}"
+                self.cursors[cursor] = items[limit:]
+        return {"cursor": cursor, "items": items[:limit]}
+
+    def answer(self, query, variables):
+        limit = variables.get("limit", PAGE_LIMIT)
+        if query == BATCH_ITEMS_QUERY:
+            ids = variables["ids"]
+        elif query == ITEMS_QUERY:
+            ids = variables["board_id"]
+        else:
+            ids = []
+        cost = self.board_cost * max(len(ids), 1) + self.item_cost * limit * max(len(ids), 1)
+        complexity, reset_in = self._charge(cost)
+        if complexity is None:
+            return 429, {"error_code": "ComplexityException", "reset_in_x_seconds": reset_in}
+
+        if query == NEXT_ITEMS_QUERY:
+            with self.lock:
+                items = self.cursors.pop(variables["cursor"])
+            data = {"next_items_page": self._page(items, limit)}
+        else:
+            data = {
+                "boards": [
+                    {"id": board_id, "items_page": self._page(self.boards[board_id], limit)}
+                    for board_id in ids
+                ]
+            }
+        data["complexity"] = complexity
+        return 200, {"data": data}
+
+    def _handler(self):
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                time.sleep(mock.latency)
+                status, payload = mock.answer(body["query"], body.get("variables") or {})
+                raw = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(raw)))
+                self.end_headers()
+                self.wfile.write(raw)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+def http_execute(url):
+    """An ``execute`` callable that POSTs GraphQL to ``url``."""
+
+    def execute(query, variables):
+        req = urlrequest.Request(
+            url,
+            data=json.dumps({"query": query, "variables": variables}).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+        )
+        try:
+            with urlrequest.urlopen(req, timeout=30) as resp:
+                return json.loads(resp.read())["data"]
+        except urlrequest.HTTPError as e:
+            if e.code == 429:
+                payload = json.loads(e.read() or b"{}")
+                raise BudgetExhausted(float(payload.get("reset_in_x_seconds") or 1.0))
+            raise
+
+    return execute
+
+
+def synthetic_boards(count, seed=7):
+    rng = random.Random(seed)
+    boards = {}
+    for b in range(count):
+        size = rng.choice([5, 16, 40, 120, 260])
+        boards[str(9000000000 + b)] = [
+            {"id": f"{b}{i:05d}", "name": f"Task {i}", "updated_at": "2025-09-20T00:00:00Z"}
+            for i in range(size)
+        ]
+    return boards
+
+
+def run_benchmark(board_counts, latency=0.05, budget=3_000_000, window=5.0, workers=MAX_WORKERS):
+    rows = []
+    for count in board_counts:
+        boards = synthetic_boards(count)
+        expected = sum(len(items) for items in boards.values())
+        row = [count, expected]
+        for mode in ("sequential", "scheduled"):
+            with MockMondayServer(boards, latency=latency, budget=budget, window=window) as mock:
+                execute = http_execute(mock.url)
+                start = time.perf_counter()
+                if mode == "sequential":
+                    results, calls = sequential_fetch(execute, list(boards))
+                else:
+                    scheduler = MondayScheduler(execute, max_workers=workers)
+                    results = scheduler.fetch_items(list(boards))
+                    calls = scheduler.calls
+                elapsed = time.perf_counter() - start
+                fetched = sum(len(items) for items in results.values())
+                assert fetched == expected, (mode, fetched, expected)
+                row.extend([elapsed, calls, mock.rejected])
+        rows.append(row)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Monday.com request scheduler")
+    sub = parser.add_subparsers(dest="command", required=True)
+    bench = sub.add_parser("bench", help="Full export wall-clock vs sequential paging")
+    bench.add_argument("--boards", default="1,25,250")
+    bench.add_argument("--latency", type=float, default=0.05, help="Seconds per mock request")
+    bench.add_argument("--budget", type=int, default=3_000_000, help="Mock complexity per window")
+    bench.add_argument("--window", type=float, default=5.0, help="Mock budget window seconds")
+    bench.add_argument("--workers", type=int, default=MAX_WORKERS)
+    args = parser.parse_args()
+
+    counts = [int(c) for c in args.boards.split(",") if c.strip()]
+    rows = run_benchmark(counts, args.latency, args.budget, args.window, args.workers)
+    print(f"mock latency {args.latency * 1000:.0f} ms, budget {args.budget} per {args.window:g}s")
+    print(
+        f"{'boards':>6}  {'items':>6}  {'seq s':>7}  {'calls':>5}  {'429s':>4}"
+        f"  {'sched s':>7}  {'calls':>5}  {'429s':>4}  {'speedup':>7}"
+    )
+    for count, items, seq_s, seq_calls, seq_429, sch_s, sch_calls, sch_429 in rows:
+        print(
+            f"{count:>6}  {items:>6}  {seq_s:7.2f}  {seq_calls:>5}  {seq_429:>4}"
+            f"  {sch_s:7.2f}  {sch_calls:>5}  {sch_429:>4}  {seq_s / sch_s:6.1f}x"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,795 @@
+#!/usr/bin/env -S uv run --script
+# /// script
+# requires-python = ">=3.8"
+# dependencies = []
+# ///
+"""
+Compiled security rule engine for the PreToolUse hook.
+
+Rules are declared in .claude/hooks/security_rules.json and compiled once
+per rule-file hash into per-tool lookup tables:
+
+- program rules are indexed by program name, so adding rules for other
+  programs costs nothing on a call that does not run them;
+- literal, ``*suffix`` and ``prefix*`` path globs are dict lookups;
+- command regexes and other wildcard globs are combined into one
+  alternation used as a prefilter, and only evaluated one by one when the
+  prefilter hits;
+- path prefixes live in a trie keyed by path component.
+
+The compiled tables are pickled to ~/.claude/data/rule_cache/ keyed by the
+SHA-256 of the rule file, so only the first call after an edit pays for
+validation and compilation.
+
+Bash commands are split with a shlex-aware tokenizer before matching, so
+quoting (``r""m``, ``'rm'``, ``\\rm``), full paths (``/bin/rm``), chained
+commands (``&&``, ``||``, ``;``, ``|``, newlines), subshells, ``$(...)`` and
+backticks, ``bash -c``/``eval``, ``find -exec``, ``xargs``, wrappers like
+``sudo``, ``env`` or ``nohup``, compound statements (``if``/``then``,
+``for``/``do``, ``!``) and ``$'...'`` quoting are all seen through. Path
+arguments have ``~``, ``$HOME`` and other variables expanded from the
+hook's environment, and glob arguments (``.env*``) are also checked
+against the files they expand to. Only the last path component is
+expanded, by listing one directory (at most ``GLOB_LIMIT`` entries), so a
+pattern like ``/*/*/zz*`` never walks the filesystem on the hook path.
+Command-name globs and variables (``r?``, ``$RM``) are not resolved, and
+here-document bodies are parsed as commands.
+
+Rule fields:
+    id, action (block|warn|log), message, tools (default: all tools)
+    program       program names a Bash segment must run
+    privileged    only match under sudo/doas/pkexec
+    flags_all     list of alternatives groups; every group must be present
+    flags_any     any of these flags must be present
+    args_any      regexes; any positional argument must match one
+    command       regex searched in the normalized segment (or whole line
+                  with "scope": "line")
+    path_prefix   path prefixes (``~`` expanded) matched via the trie
+    path_glob     basename globs, with path_exclude globs as exceptions
+    path_access   "any" (default) or "write"
+
+Command line:
+
+    uv run .claude/hooks/utils/rule_engine.py hook < pre_tool_use_input.json
+    uv run .claude/hooks/utils/rule_engine.py verify
+    uv run .claude/hooks/utils/rule_engine.py bench [--rule-counts 100,1000,5000]
+"""
+
+import argparse
+import codecs
+import fnmatch
+import hashlib
+import itertools
+import json
+import os
+import pickle
+import random
+import re
+import shlex
+import sys
+import tempfile
+import time
+from collections import namedtuple
+from pathlib import Path
+
+
+HOOKS_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_RULES = HOOKS_DIR / "security_rules.json"
+DEFAULT_CASES = HOOKS_DIR / "security_rule_cases.json"
+CACHE_DIR = Path.home() / ".claude" / "data" / "rule_cache"
+ENGINE_VERSION = 2
+
+ACTIONS = ("block", "warn", "log")
+RULE_FIELDS = {
+    "id", "action", "message", "tools", "program", "privileged", "flags_all",
+    "flags_any", "args_any", "command", "scope", "path_prefix", "path_glob",
+    "path_exclude", "path_access",
+}
+PATH_FIELDS = ("file_path", "path", "notebook_path")
+WRITE_TOOLS = {"Write", "Edit", "MultiEdit", "NotebookEdit"}
+
+SEPARATORS = {"&&", "||", ";", ";;", "|", "|&", "&", "(", ")", "{", "}", "$", "\n"}
+WRITE_REDIRECTS = {">", ">>", ">|", "&>", "&>>", "<>", ">&"}
+READ_REDIRECTS = {"<", "<<", "<<<", "<&"}
+PRIVILEGE_WRAPPERS = {"sudo", "doas", "pkexec"}
+WRAPPERS = {
+    "env", "nohup", "nice", "ionice", "time", "command", "builtin", "exec",
+    "stdbuf", "timeout", "xargs", "watch", "unbuffer", "chronic",
+}
+# Wrapper options that consume the following word.
+WRAPPER_OPTION_ARGS = {
+    "sudo": {"-u", "-g", "-C", "-h", "-p", "-U", "-r", "-t", "-D"},
+    "doas": {"-u", "-C"},
+    "nice": {"-n"},
+    "ionice": {"-c", "-n", "-p"},
+    "xargs": {"-I", "-L", "-n", "-P", "-d", "-E", "-s", "-a"},
+    "env": {"-u", "-C", "-S"},
+    "watch": {"-n", "-d"},
+    "timeout": {"-s", "-k", "--signal", "--kill-after"},
+}
+# Reserved words that can start a simple command inside compound statements.
+SHELL_KEYWORDS = {"if", "then", "elif", "else", "do", "while", "until", "!", "case"}
+SHELLS = {"sh", "bash", "zsh", "dash", "ksh", "fish"}
+WRITE_ALL_ARGS = {"tee", "touch", "mkdir", "rm", "rmdir", "truncate", "chmod", "chown", "chgrp", "shred"}
+WRITE_LAST_ARG = {"cp", "mv", "install", "ln", "rsync", "scp"}
+GLOB_LIMIT = 1000
+_ASSIGNMENT = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*=")
+_ANSI_C = re.compile(r"\$'((?:[^'\\]|\\.)*)'")
+_LOCALE_QUOTE = re.compile(r"(?<![\w\\\"'])\$\"")
+
+Match = namedtuple("Match", "rule_id action message target")
+Segment = namedtuple("Segment", "program args flags positionals privileged writes reads normalized")
+
+
+# ---------------------------------------------------------------- tokenizer
+
+
+def _substitutions(command):
+    """Bodies of every ``$(...)`` and backtick substitution in ``command``."""
+    bodies = []
+    i = 0
+    while i < len(command):
+        if command.startswith("$(", i):
+            depth, j = 1, i + 2
+            while j < len(command) and depth:
+                if command[j] == "(":
+                    depth += 1
+                elif command[j] == ")":
+                    depth -= 1
+                j += 1
+            bodies.append(command[i + 2:j - 1] if depth == 0 else command[i + 2:])
+            i = j
+        elif command[i] == "`":
+            end = command.find("`", i + 1)
+            if end < 0:
+                bodies.append(command[i + 1:])
+                break
+            bodies.append(command[i + 1:end])
+            i = end + 1
+        else:
+            i += 1
+    return bodies
+
+
+def _decode_ansi_c(match):
+    body = match.group(1)
+    try:
+        body = codecs.decode(body.encode("latin-1", "backslashreplace"), "unicode_escape")
+    except (UnicodeDecodeError, ValueError):
+        pass
+    return shlex.quote(body)
+
+
+def _unquote_bash(command):
+    """Rewrite ``$'...'`` (ANSI-C) and ``$"..."`` (locale) quoting as plain quotes."""
+    if "$'" in command:
+        command = _ANSI_C.sub(_decode_ansi_c, command)
+    if '$"' in command:
+        command = _LOCALE_QUOTE.sub('"', command)
+    return command
+
+
+def _tokens(command):
+    # Unquoted newlines end a command like ";", so they are punctuation
+    # rather than whitespace; backslash-newline is a line continuation.
+    command = command.replace("\\\n", "")
+    lexer = shlex.shlex(command, posix=True, punctuation_chars="();<>|&\n")
+    lexer.whitespace = " \t\r"
+    lexer.whitespace_split = True
+    lexer.commenters = ""
+    try:
+        return list(lexer)
+    except ValueError:
+        # Unbalanced quotes: fall back to a plain split rather than skipping.
+        command = command.replace("'", " ").replace('"', " ").replace("\n", " ; ")
+        return command.split()
+
+
+def _flag_set(args):
+    flags, positionals = set(), []
+    options_done = False
+    for arg in args:
+        if options_done or arg == "-" or not arg.startswith("-"):
+            positionals.append(arg)
+        elif arg == "--":
+            options_done = True
+        elif arg.startswith("--"):
+            flags.add(arg.split("=", 1)[0])
+        elif arg[1:2].isdigit():
+            positionals.append(arg)
+        else:
+            flags.update("-" + c for c in arg[1:])
+    return flags, positionals
+
+
+def _strip_wrappers(words):
+    """Drop env assignments and wrapper commands. Returns (words, privileged)."""
+    privileged = False
+    while words:
+        while words and _ASSIGNMENT.match(words[0]):
+            words = words[1:]
+        if not words:
+            break
+        name = os.path.basename(words[0]).lstrip("\\")
+        if name in SHELL_KEYWORDS:
+            words = words[1:]
+            continue
+        if name not in PRIVILEGE_WRAPPERS and name not in WRAPPERS:
+            break
+        privileged = privileged or name in PRIVILEGE_WRAPPERS
+        takes_arg = WRAPPER_OPTION_ARGS.get(name, set())
+        i = 1
+        while i < len(words) and (words[i].startswith("-") or _ASSIGNMENT.match(words[i])):
+            i += 2 if words[i] in takes_arg else 1
+        if name == "timeout" and i < len(words):
+            i += 1  # duration
+        words = words[i:]
+    return words, privileged
+
+
+def _segment(words, writes, reads):
+    words, privileged = _strip_wrappers(words)
+    if not words:
+        return None
+    program = os.path.basename(words[0]).lstrip("\\")
+    args = words[1:]
+    flags, positionals = _flag_set(args)
+    return Segment(
+        program, args, flags, positionals, privileged, writes, reads,
+        " ".join([program] + args),
+    )
+
+
+def parse_command(command, _depth=0):
+    """
+    Split a shell command line into normalized segments.
+
+    Returns (segments, line) where ``line`` is the whole command with
+    quoting removed, for rules scoped to the full line. Nested commands
+    (substitutions, ``bash -c``, ``eval``, ``find -exec``) contribute their
+    own segments.
+    """
+    segments = []
+    if _depth > 5:
+        return segments, ""
+    command = _unquote_bash(command)
+    tokens = _tokens(command)
+    for body in _substitutions(command):
+        segments.extend(parse_command(body, _depth + 1)[0])
+
+    words, writes, reads = [], [], []
+    pending = None
+    for token in tokens:
+        token = token.strip("`")
+        if pending is not None:
+            pending.append(token)
+            pending = None
+            continue
+        if token in WRITE_REDIRECTS or token in READ_REDIRECTS:
+            pending = writes if token in WRITE_REDIRECTS else reads
+            continue
+        if token in SEPARATORS or (token and set(token) <= set("();&|\n")):
+            segments.extend(_finish(words, writes, reads, _depth))
+            words, writes, reads = [], [], []
+            continue
+        if token.startswith("$(") or token in ("", "$"):
+            continue
+        words.append(token)
+    segments.extend(_finish(words, writes, reads, _depth))
+    return segments, " ".join(t.strip("`") for t in tokens)
+
+
+def _finish(words, writes, reads, depth):
+    segment = _segment(words, writes, reads)
+    if segment is None:
+        return []
+    found = [segment]
+    if segment.program in SHELLS and "-c" in segment.flags and segment.positionals:
+        found.extend(parse_command(segment.positionals[0], depth + 1)[0])
+    elif segment.program == "eval" and segment.args:
+        found.extend(parse_command(" ".join(segment.args), depth + 1)[0])
+    elif segment.program == "find":
+        args = segment.args
+        for i, arg in enumerate(args):
+            if arg in ("-exec", "-execdir", "-ok", "-okdir"):
+                end = next(
+                    (j for j in range(i + 1, len(args)) if args[j] in (";", "\\;", "+")),
+                    len(args),
+                )
+                nested = _segment(args[i + 1:end], [], [])
+                if nested is not None:
+                    found.append(nested)
+    return found
+
+
+def _segment_paths(segment, access):
+    """Candidate paths a segment touches (``access`` is "any" or "write")."""
+    paths = list(segment.writes)
+    if access == "write":
+        if segment.program in WRITE_ALL_ARGS:
+            paths.extend(segment.positionals)
+        elif segment.program in WRITE_LAST_ARG and segment.positionals:
+            paths.append(segment.positionals[-1])
+        elif segment.program == "sed" and ("-i" in segment.flags or "--in-place" in segment.flags):
+            paths.extend(segment.positionals[1:])
+        paths.extend(a[3:] for a in segment.args if a.startswith("of="))
+        return paths
+    paths.extend(segment.reads)
+    for arg in segment.args:
+        paths.append(arg)
+        if "=" in arg:
+            paths.append(arg.split("=", 1)[1])
+    return paths
+
+
+# ---------------------------------------------------------------- compiler
+
+
+def _expand(path):
+    return os.path.normpath(os.path.expanduser(path))
+
+
+def _components(path):
+    return [part for part in path.split(os.sep) if part]
+
+
+def _is_wildcard(glob):
+    return any(c in glob for c in "*?[")
+
+
+def _shell_path(path):
+    """Expand ``~``, ``$HOME`` and ``${VAR}`` the way the shell would."""
+    return os.path.expandvars(os.path.expanduser(path))
+
+
+def _expand_glob(pattern, cwd):
+    """Files a shell glob argument expands to (dotfiles only for ``.*`` patterns).
+
+    Only a wildcard in the last component is expanded, from a single
+    directory listing capped at ``GLOB_LIMIT`` entries; anything deeper is
+    left for the literal check.
+    """
+    head, tail = os.path.split(pattern)
+    if not tail or _is_wildcard(head):
+        return []
+    directory = os.path.join(cwd, head)
+    hidden = tail.startswith(".")
+    hits = []
+    try:
+        with os.scandir(directory) as entries:
+            for entry in itertools.islice(entries, GLOB_LIMIT):
+                if (hidden or not entry.name.startswith(".")) and fnmatch.fnmatchcase(entry.name, tail):
+                    hits.append(os.path.join(directory, entry.name))
+    except OSError:
+        return []
+    return sorted(hits)
+
+
+def _glob_regex(globs):
+    return "(?:" + "|".join(fnmatch.translate(g) for g in globs) + ")"
+
+
+class _Tables:
+    """Lookup tables for the rules that apply to one tool."""
+
+    def __init__(self, rules):
+        self.by_program = {}
+        self.segment_regex = []
+        self.line_regex = []
+        self.trie = {}
+        self.glob_literal = {}
+        self.glob_suffix = {}
+        self.glob_prefix = {}
+        self.glob_wildcard = []
+        self.access = {"any": False, "write": False}
+
+        for rule in rules:
+            for program in rule.get("program") or []:
+                self.by_program.setdefault(program, []).append(rule)
+            if rule.get("command") and not rule.get("program"):
+                target = self.line_regex if rule.get("scope") == "line" else self.segment_regex
+                target.append(rule)
+            for prefix in rule.get("path_prefix") or []:
+                node = self.trie
+                for part in _components(_expand(prefix)):
+                    node = node.setdefault(part, {})
+                node.setdefault(None, []).append(rule)
+            for glob in rule.get("path_glob") or []:
+                head, tail = glob[:1], glob[1:]
+                if not _is_wildcard(glob):
+                    self.glob_literal.setdefault(glob, []).append(rule)
+                elif head == "*" and not _is_wildcard(tail):
+                    self.glob_suffix.setdefault(tail, []).append(rule)
+                elif glob.endswith("*") and not _is_wildcard(glob[:-1]):
+                    self.glob_prefix.setdefault(glob[:-1], []).append(rule)
+                else:
+                    self.glob_wildcard.append((re.compile(fnmatch.translate(glob)), rule))
+            if rule.get("path_prefix") or rule.get("path_glob"):
+                self.access[rule.get("path_access", "any")] = True
+
+        self.segment_prefilter = self._prefilter(self.segment_regex)
+        self.line_prefilter = self._prefilter(self.line_regex)
+        self.glob_prefilter = (
+            re.compile("|".join("(?:%s)" % r.pattern for r, _ in self.glob_wildcard))
+            if self.glob_wildcard
+            else None
+        )
+
+    @staticmethod
+    def _prefilter(rules):
+        if not rules:
+            return None
+        return re.compile("|".join("(?:%s)" % r["command"].pattern for r in rules))
+
+
+def _compile_rule(rule):
+    unknown = set(rule) - RULE_FIELDS
+    rule_id = rule.get("id")
+    if not rule_id:
+        raise ValueError("Every rule needs an id")
+    if unknown:
+        raise ValueError(f"Rule {rule_id}: unknown fields {sorted(unknown)}")
+    if rule.get("action") not in ACTIONS:
+        raise ValueError(f"Rule {rule_id}: action must be one of {ACTIONS}")
+    is_path = bool(rule.get("path_prefix") or rule.get("path_glob"))
+    is_command = bool(rule.get("program") or rule.get("command"))
+    if is_path == is_command:
+        raise ValueError(f"Rule {rule_id}: needs either a program/command or a path condition")
+    if rule.get("path_access", "any") not in ("any", "write"):
+        raise ValueError(f"Rule {rule_id}: path_access must be 'any' or 'write'")
+
+    compiled = dict(rule)
+    compiled.setdefault("message", rule_id)
+    if rule.get("command"):
+        compiled["command"] = re.compile(rule["command"])
+    if rule.get("args_any"):
+        compiled["args_any"] = [re.compile(p) for p in rule["args_any"]]
+    if rule.get("path_exclude"):
+        compiled["path_exclude"] = re.compile(_glob_regex(rule["path_exclude"]))
+    if rule.get("flags_all"):
+        compiled["flags_all"] = [set(group) for group in rule["flags_all"]]
+    if rule.get("flags_any"):
+        compiled["flags_any"] = set(rule["flags_any"])
+    return compiled
+
+
+class RuleSet:
+    """Rules compiled into per-tool tables. Build with ``load_rules()``."""
+
+    def __init__(self, rules, digest=""):
+        self.digest = digest
+        compiled = [_compile_rule(rule) for rule in rules]
+        tools = {tool for rule in compiled for tool in rule.get("tools") or []}
+        self.tables = {
+            tool: _Tables([r for r in compiled if not r.get("tools") or tool in r["tools"]])
+            for tool in tools
+        }
+        self.default = _Tables([r for r in compiled if not r.get("tools")])
+        self.rule_count = len(compiled)
+
+    def evaluate(self, tool_name, tool_input, cwd=None):
+        """Return every Match for one tool call, in rule-file order per check."""
+        tables = self.tables.get(tool_name, self.default)
+        tool_input = tool_input if isinstance(tool_input, dict) else {}
+        cwd = cwd or os.getcwd()
+        matches = []
+
+        if tool_name == "Bash":
+            command = str(tool_input.get("command") or "")
+            segments, line = parse_command(command)
+            if tables.line_prefilter and tables.line_prefilter.search(line):
+                for rule in tables.line_regex:
+                    if rule["command"].search(line):
+                        matches.append(Match(rule["id"], rule["action"], rule["message"], line))
+            for segment in segments:
+                self._match_segment(tables, segment, matches)
+            for access in ("any", "write"):
+                if not tables.access[access]:
+                    continue
+                current = cwd
+                for segment in segments:
+                    if segment.program == "cd" and segment.positionals:
+                        target = _shell_path(segment.positionals[0])
+                        current = os.path.join(current, target)
+                        continue
+                    for path in _segment_paths(segment, access):
+                        path = _shell_path(path)
+                        # A glob that matches files is replaced by them;
+                        # one that matches nothing is passed on literally.
+                        hits = _expand_glob(path, current) if _is_wildcard(path) else ()
+                        for hit in hits or (path,):
+                            self._match_path(tables, hit, current, access, matches)
+        else:
+            access = "write" if tool_name in WRITE_TOOLS else "read"
+            paths = [tool_input.get(field) for field in PATH_FIELDS]
+            if tool_name == "Glob":
+                paths.append(tool_input.get("pattern"))
+            for path in paths:
+                if path:
+                    self._match_path(tables, str(path), cwd, access, matches)
+
+        seen, unique = set(), []
+        for match in matches:
+            if match.rule_id not in seen:
+                seen.add(match.rule_id)
+                unique.append(match)
+        return unique
+
+    @staticmethod
+    def _match_segment(tables, segment, matches):
+        for rule in tables.by_program.get(segment.program, ()):
+            if rule.get("privileged") and not segment.privileged:
+                continue
+            if any(not (group & segment.flags) for group in rule.get("flags_all", ())):
+                continue
+            if rule.get("flags_any") and not rule["flags_any"] & segment.flags:
+                continue
+            if rule.get("args_any") and not any(
+                p.search(arg) for p in rule["args_any"] for arg in segment.positionals
+            ):
+                continue
+            if rule.get("command") and not rule["command"].search(segment.normalized):
+                continue
+            matches.append(Match(rule["id"], rule["action"], rule["message"], segment.normalized))
+
+        if tables.segment_prefilter and tables.segment_prefilter.search(segment.normalized):
+            for rule in tables.segment_regex:
+                if rule["command"].search(segment.normalized):
+                    matches.append(
+                        Match(rule["id"], rule["action"], rule["message"], segment.normalized)
+                    )
+
+    @staticmethod
+    def _match_path(tables, path, cwd, access, matches):
+        expanded = os.path.expanduser(path)
+        full = os.path.normpath(os.path.join(cwd, expanded))
+        base = os.path.basename(full.rstrip(os.sep)) or full
+
+        candidates = []
+        node = tables.trie
+        for part in _components(full):
+            node = node.get(part)
+            if node is None:
+                break
+            candidates.extend(node.get(None, ()))
+        candidates.extend(tables.glob_literal.get(base, ()))
+        if tables.glob_suffix or tables.glob_prefix:
+            for i in range(len(base) + 1):
+                candidates.extend(tables.glob_suffix.get(base[i:], ()))
+                candidates.extend(tables.glob_prefix.get(base[:i], ()))
+        if tables.glob_prefilter and tables.glob_prefilter.match(base):
+            candidates.extend(rule for regex, rule in tables.glob_wildcard if regex.match(base))
+
+        for rule in candidates:
+            if rule.get("path_access") == "write" and access != "write":
+                continue
+            if rule.get("path_exclude") and rule["path_exclude"].match(base):
+                continue
+            matches.append(Match(rule["id"], rule["action"], rule["message"], full))
+
+
+# ---------------------------------------------------------------- loading
+
+
+_loaded = {}
+
+
+def load_rules(path=DEFAULT_RULES, cache_dir=CACHE_DIR):
+    """Load a rule file, using the on-disk compiled cache when it is current."""
+    raw = Path(path).read_bytes()
+    digest = hashlib.sha256(raw + str(ENGINE_VERSION).encode()).hexdigest()
+    if digest in _loaded:
+        return _loaded[digest]
+
+    cache_file = Path(cache_dir) / f"{digest}.pickle" if cache_dir else None
+    ruleset = None
+    if cache_file is not None:
+        try:
+            with open(cache_file, "rb") as f:
+                ruleset = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            ruleset = None
+
+    if ruleset is None:
+        ruleset = RuleSet(json.loads(raw.decode("utf-8")).get("rules", []), digest)
+        if cache_file is not None:
+            try:
+                cache_file.parent.mkdir(parents=True, exist_ok=True)
+                fd, tmp = tempfile.mkstemp(dir=cache_file.parent, suffix=".tmp")
+                with os.fdopen(fd, "wb") as f:
+                    pickle.dump(ruleset, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp, cache_file)
+            except OSError:
+                pass
+
+    _loaded[digest] = ruleset
+    return ruleset
+
+
+def decide(matches):
+    """The strongest action among ``matches`` (block > warn > log), or None."""
+    for action in ACTIONS:
+        if any(m.action == action for m in matches):
+            return action
+    return None
+
+
+def check_tool_call(tool_name, tool_input, cwd=None, rules_path=DEFAULT_RULES):
+    """Evaluate one tool call. Returns (action or None, matches)."""
+    matches = load_rules(rules_path).evaluate(tool_name, tool_input, cwd)
+    return decide(matches), matches
+
+
+# ---------------------------------------------------------------- commands
+
+
+def verify(cases_path=DEFAULT_CASES, rules_path=DEFAULT_RULES):
+    """Run the evasion regression cases. Returns the list of failures."""
+    with open(cases_path, "r") as f:
+        cases = json.load(f)["cases"]
+    ruleset = load_rules(rules_path, cache_dir=None)
+    failures = []
+    for case in cases:
+        cwd = case.get("cwd", "/home/user/project")
+        with tempfile.TemporaryDirectory() as tmp:
+            if case.get("files"):
+                # Glob cases need real files for the shell-style expansion.
+                cwd = tmp
+                for name in case["files"]:
+                    Path(tmp, name).touch()
+            start = time.perf_counter()
+            matches = ruleset.evaluate(case["tool_name"], case["tool_input"], cwd)
+            elapsed_ms = (time.perf_counter() - start) * 1000
+        action = decide(matches) or "allow"
+        if "max_ms" in case and elapsed_ms > case["max_ms"]:
+            action = f"{action} after {elapsed_ms:.0f} ms (limit {case['max_ms']} ms)"
+        if action != case["expect"]:
+            failures.append((case, action, [m.rule_id for m in matches]))
+    return failures
+
+
+def _load_corpus(log_dir="logs"):
+    """Tool calls from logs/pre_tool_use.json(l), if any have been recorded."""
+    corpus = []
+    json_path = Path(log_dir) / "pre_tool_use.json"
+    jsonl_path = Path(log_dir) / "pre_tool_use.jsonl"
+    try:
+        if json_path.exists():
+            with open(json_path) as f:
+                corpus.extend(json.load(f))
+        if jsonl_path.exists():
+            with open(jsonl_path) as f:
+                corpus.extend(json.loads(line) for line in f if line.strip())
+    except (OSError, json.JSONDecodeError):
+        pass
+    return [e for e in corpus if isinstance(e, dict) and e.get("tool_name")]
+
+
+def _synthetic_corpus(size, rng):
+    commands = [
+        "ls -la", "git status", "git diff --stat HEAD~1", "npm run build && npm test",
+        "python -m pytest -q tests/", "cat README.md | head -50", "rg -n 'TODO' src/",
+        "uv run .claude/hooks/session_start.py", "find . -name '*.py' -exec wc -l {} +",
+        "docker compose up -d", "rm -f build/output.log", "mkdir -p out && cp a.txt out/",
+        "curl -s https://api.example.com/status | jq .", "echo $HOME > /tmp/home.txt",
+    ]
+    corpus = []
+    for i in range(size):
+        if i % 4 == 0:
+            corpus.append({"tool_name": "Read", "tool_input": {"file_path": f"/home/user/project/src/mod{i}.py"}})
+        else:
+            corpus.append({"tool_name": "Bash", "tool_input": {"command": rng.choice(commands)}})
+    return corpus
+
+
+def _synthetic_rules(count, rng):
+    rules = json.loads(DEFAULT_RULES.read_text())["rules"]
+    for i in range(count):
+        kind = i % 4
+        rule = {"id": f"synthetic-{i}", "action": rng.choice(ACTIONS)}
+        if kind == 0:
+            rule.update(tools=["Bash"], program=[f"tool{i}"], flags_any=["--force", "-x"])
+        elif kind == 1:
+            rule.update(tools=["Bash"], command=rf"\bdeploy{i}\b.*--prod")
+        elif kind == 2:
+            rule.update(tools=["Bash", "Read", "Write"], path_prefix=[f"/opt/app{i}/"])
+        else:
+            rule.update(tools=["Bash", "Read"], path_glob=[f"*.secret{i}"])
+        rules.append(rule)
+    return rules
+
+
+def _naive_matches(rules, tool_name, tool_input):
+    """Baseline: each rule's own regex run one after another on the raw input."""
+    text = tool_input.get("command") or tool_input.get("file_path") or ""
+    hits = 0
+    for rule in rules:
+        if rule.get("tools") and tool_name not in rule["tools"]:
+            continue
+        for pattern in rule["_naive"]:
+            if pattern.search(text):
+                hits += 1
+                break
+    return hits
+
+
+def run_benchmark(rule_counts, corpus_size=5000, seed=7):
+    rng = random.Random(seed)
+    corpus = _load_corpus() or _synthetic_corpus(corpus_size, rng)
+    source = "logs/pre_tool_use" if _load_corpus() else "synthetic"
+    rows = []
+    for count in rule_counts:
+        rules = _synthetic_rules(count, rng)
+        start = time.perf_counter()
+        ruleset = RuleSet(rules)
+        compile_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        for call in corpus:
+            ruleset.evaluate(call["tool_name"], call.get("tool_input") or {}, "/home/user/project")
+        engine_rate = len(corpus) / (time.perf_counter() - start)
+
+        for rule in rules:
+            patterns = [rule["command"]] if rule.get("command") else []
+            patterns += [r"\b%s\b" % re.escape(p) for p in rule.get("program", [])]
+            patterns += [re.escape(p) for p in rule.get("path_prefix", [])]
+            patterns += [fnmatch.translate(g)[4:-3] for g in rule.get("path_glob", [])]
+            rule["_naive"] = [re.compile(p) for p in patterns]
+        start = time.perf_counter()
+        for call in corpus:
+            _naive_matches(rules, call["tool_name"], call.get("tool_input") or {})
+        naive_rate = len(corpus) / (time.perf_counter() - start)
+        rows.append((count, compile_ms, engine_rate, naive_rate))
+    return source, len(corpus), rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compiled PreToolUse security rules")
+    parser.add_argument("--rules", dest="rules_path", default=str(DEFAULT_RULES))
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("hook", help="Evaluate PreToolUse JSON from stdin; exit 2 to block")
+    check = sub.add_parser("verify", help="Run the evasion regression cases")
+    check.add_argument("--cases", default=str(DEFAULT_CASES))
+    bench = sub.add_parser("bench", help="Throughput vs sequential per-rule regexes")
+    bench.add_argument("--rule-counts", default="100,1000,5000")
+    args = parser.parse_args()
+
+    if args.command == "hook":
+        try:
+            input_data = json.load(sys.stdin)
+        except json.JSONDecodeError:
+            return 0
+        action, matches = check_tool_call(
+            input_data.get("tool_name", ""),
+            input_data.get("tool_input", {}),
+            input_data.get("cwd"),
+            args.rules_path,
+        )
+        if action == "block":
+            blocked = next(m for m in matches if m.action == "block")
+            print(f"BLOCKED: {blocked.message}", file=sys.stderr)
+            return 2
+        if action == "warn":
+            for m in matches:
+                if m.action == "warn":
+                    print(f"WARNING: {m.message}", file=sys.stderr)
+        return 0
+
+    if args.command == "verify":
+        failures = verify(args.cases, args.rules_path)
+        for case, action, rule_ids in failures:
+            print(f"FAIL {case['name']}: expected {case['expect']}, got {action} {rule_ids}")
+        print(f"{'FAILED' if failures else 'OK'}: {len(failures)} failure(s)")
+        return 1 if failures else 0
+
+    counts = [int(c) for c in args.rule_counts.split(",") if c.strip()]
+    source, size, rows = run_benchmark(counts)
+    print(f"corpus: {size} calls ({source})")
+    print(f"{'rules':>7}  {'compile ms':>10}  {'engine calls/s':>15}  {'sequential calls/s':>19}")
+    for count, compile_ms, engine_rate, naive_rate in rows:
+        print(f"{count:>7}  {compile_ms:10.1f}  {engine_rate:15.0f}  {naive_rate:19.0f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
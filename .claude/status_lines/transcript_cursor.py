@@ -0,0 +1,336 @@
+#!/usr/bin/env -S uv run --script
+# /// script
+# requires-python = ">=3.8"
+# dependencies = []
+# ///
+"""
+Incremental transcript parser for the conversation status line.
+
+parse_context_usage_from_transcript() used to re-read the whole
+~/.claude/projects/<project>/<session_id>.jsonl on every refresh. This module
+keeps a small per-session cursor on disk (byte offset, inode, size, a hash of
+the file head and the running token aggregates) so each refresh only parses
+the lines appended since the previous one.
+
+The cursor is reset and the transcript re-read from the start when the file
+is replaced (different inode or head), truncated (size below the offset) or
+the cursor itself is missing or unreadable. A trailing partial line is left
+for the next refresh.
+
+Usage from a status line script:
+
+    from transcript_cursor import read_transcript_usage
+    usage = read_transcript_usage(input_data["transcript_path"], input_data["session_id"])
+    usage["context_tokens"], usage["model"]
+
+Command line:
+
+    uv run .claude/status_lines/transcript_cursor.py show <transcript.jsonl>
+    uv run .claude/status_lines/transcript_cursor.py bench [--sizes-mb 1,10,50]
+"""
+
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+
+CURSOR_DIR = Path.home() / ".claude" / "data" / "transcript_cursors"
+CURSOR_VERSION = 1
+HEAD_BYTES = 256
+
+TOKEN_FIELDS = (
+    "input_tokens",
+    "output_tokens",
+    "cache_creation_input_tokens",
+    "cache_read_input_tokens",
+)
+EPHEMERAL_FIELDS = ("ephemeral_5m_input_tokens", "ephemeral_1h_input_tokens")
+
+
+def _empty_aggregates():
+    totals = {field: 0 for field in TOKEN_FIELDS + EPHEMERAL_FIELDS}
+    return {
+        "totals": totals,
+        "last_usage": {field: 0 for field in TOKEN_FIELDS + EPHEMERAL_FIELDS},
+        "last_message_id": None,
+        "model": None,
+        "messages": 0,
+    }
+
+
+def _head_hash(fd, length):
+    return hashlib.sha1(os.pread(fd, length, 0)).hexdigest()
+
+
+def _flatten_usage(usage):
+    flat = {field: int(usage.get(field) or 0) for field in TOKEN_FIELDS}
+    cache_creation = usage.get("cache_creation") or {}
+    for field in EPHEMERAL_FIELDS:
+        flat[field] = int(cache_creation.get(field) or 0)
+    return flat
+
+
+def _apply_entry(aggregates, entry):
+    message = entry.get("message")
+    if not isinstance(message, dict):
+        return
+    usage = message.get("usage")
+    if not isinstance(usage, dict):
+        return
+
+    flat = _flatten_usage(usage)
+    message_id = message.get("id")
+    # Claude Code writes one line per content block, each repeating the
+    # message's usage; only count a message once.
+    if message_id and message_id == aggregates["last_message_id"]:
+        for field, value in aggregates["last_usage"].items():
+            aggregates["totals"][field] -= value
+    else:
+        aggregates["messages"] += 1
+
+    for field, value in flat.items():
+        aggregates["totals"][field] += value
+    aggregates["last_usage"] = flat
+    aggregates["last_message_id"] = message_id
+    if message.get("model") and message["model"] != "<synthetic>":
+        aggregates["model"] = message["model"]
+
+
+def _parse_range(fd, start, end, aggregates):
+    """Parse complete lines in [start, end). Returns the new offset."""
+    if end <= start:
+        return start
+    with mmap.mmap(fd, 0, access=mmap.ACCESS_READ) as view:
+        last_newline = view.rfind(b"\n", start, end)
+        if last_newline < 0:
+            return start
+        pos = start
+        while pos <= last_newline:
+            nl = view.find(b"\n", pos, last_newline + 1)
+            line = view[pos:nl]
+            pos = nl + 1
+            # Cheap pre-filter: only assistant messages carry usage.
+            if b'"usage"' not in line:
+                continue
+            try:
+                _apply_entry(aggregates, json.loads(line))
+            except (json.JSONDecodeError, UnicodeDecodeError, TypeError, ValueError):
+                continue
+        return last_newline + 1
+
+
+def _cursor_path(session_id, cursor_dir):
+    safe = "".join(c for c in str(session_id) if c.isalnum() or c in "-_") or "default"
+    return Path(cursor_dir) / f"{safe}.json"
+
+
+def _load_cursor(path):
+    try:
+        with open(path, "r") as f:
+            cursor = json.load(f)
+        if cursor.get("version") == CURSOR_VERSION:
+            return cursor
+    except (OSError, json.JSONDecodeError, AttributeError):
+        pass
+    return None
+
+
+def _save_cursor(path, cursor):
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(cursor, f)
+        os.replace(tmp, path)
+    except OSError:
+        pass
+
+
+def _summary(aggregates, transcript_path):
+    last = aggregates["last_usage"]
+    summary = dict(aggregates["totals"])
+    summary.update(
+        {
+            "model": aggregates["model"],
+            "messages": aggregates["messages"],
+            "last_usage": dict(last),
+            # Tokens the most recent request actually sent: the active context.
+            "context_tokens": last["input_tokens"]
+            + last["cache_creation_input_tokens"]
+            + last["cache_read_input_tokens"],
+            "transcript_path": str(transcript_path),
+        }
+    )
+    return summary
+
+
+def read_transcript_usage(transcript_path, session_id=None, cursor_dir=CURSOR_DIR):
+    """
+    Return token aggregates for a transcript, parsing only new lines.
+
+    The returned dict has the summed ``input_tokens``, ``output_tokens``,
+    ``cache_creation_input_tokens``, ``cache_read_input_tokens`` and
+    ephemeral 5m/1h cache tokens, plus ``model``, ``messages``,
+    ``last_usage`` and ``context_tokens``. Returns None if the transcript
+    cannot be read.
+    """
+    transcript_path = Path(transcript_path).expanduser()
+    session_id = session_id or transcript_path.stem
+    cursor_file = _cursor_path(session_id, cursor_dir)
+
+    try:
+        fd = os.open(transcript_path, os.O_RDONLY)
+    except OSError:
+        return None
+    try:
+        st = os.fstat(fd)
+        cursor = _load_cursor(cursor_file)
+
+        reusable = (
+            cursor is not None
+            and cursor.get("path") == str(transcript_path)
+            and cursor.get("inode") == st.st_ino
+            and cursor.get("device") == st.st_dev
+            and cursor.get("offset", 0) <= st.st_size
+            and cursor.get("head") == _head_hash(fd, cursor.get("head_len", 0))
+        )
+        if reusable:
+            aggregates = cursor["aggregates"]
+            offset = cursor["offset"]
+            if offset == st.st_size:
+                return _summary(aggregates, transcript_path)
+        else:
+            aggregates = _empty_aggregates()
+            offset = 0
+
+        offset = _parse_range(fd, offset, st.st_size, aggregates)
+        head_len = min(st.st_size, HEAD_BYTES)
+        new_cursor = {
+            "version": CURSOR_VERSION,
+            "path": str(transcript_path),
+            "inode": st.st_ino,
+            "device": st.st_dev,
+            "size": st.st_size,
+            "offset": offset,
+            "head_len": head_len,
+            "head": _head_hash(fd, head_len),
+            "aggregates": aggregates,
+        }
+        _save_cursor(cursor_file, new_cursor)
+        return _summary(aggregates, transcript_path)
+    finally:
+        os.close(fd)
+
+
+def _synthetic_lines(count, start=0):
+    """Yield transcript lines shaped like Claude Code's session JSONL."""
+    for i in range(start, start + count):
+        yield json.dumps(
+            {
+                "type": "user",
+                "sessionId": "bench",
+                "message": {"role": "user", "content": "prompt " + "x" * 400},
+            }
+        )
+        yield json.dumps(
+            {
+                "type": "assistant",
+                "sessionId": "bench",
+                "message": {
+                    "id": f"msg_{i:08d}",
+                    "role": "assistant",
+                    "model": "claude-sonnet-4-20250514",
+                    "content": [{"type": "text", "text": "y" * 1200}],
+                    "usage": {
+                        "input_tokens": 4,
+                        "cache_creation_input_tokens": 120,
+                        "cache_read_input_tokens": 1000 + i,
+                        "cache_creation": {
+                            "ephemeral_5m_input_tokens": 120,
+                            "ephemeral_1h_input_tokens": 0,
+                        },
+                        "output_tokens": 50,
+                    },
+                },
+            }
+        )
+
+
+def write_synthetic_transcript(path, size_mb):
+    """Write a synthetic transcript of roughly ``size_mb`` MB. Returns pairs written."""
+    target = size_mb * 1024 * 1024
+    pairs = 0
+    with open(path, "w") as f:
+        while f.tell() < target:
+            for line in _synthetic_lines(500, start=pairs):
+                f.write(line + "\n")
+            pairs += 500
+    return pairs
+
+
+def run_benchmark(sizes_mb, refreshes=50):
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        for size_mb in sizes_mb:
+            transcript = tmp / f"bench_{size_mb}mb.jsonl"
+            cursor_dir = tmp / f"cursors_{size_mb}"
+            pairs = write_synthetic_transcript(transcript, size_mb)
+
+            start = time.perf_counter()
+            read_transcript_usage(transcript, "bench", cursor_dir)
+            cold_ms = (time.perf_counter() - start) * 1000
+
+            # Steady state: one new exchange between refreshes.
+            timings = []
+            for i in range(refreshes):
+                with open(transcript, "a") as f:
+                    for line in _synthetic_lines(1, start=pairs + i):
+                        f.write(line + "\n")
+                start = time.perf_counter()
+                usage = read_transcript_usage(transcript, "bench", cursor_dir)
+                timings.append((time.perf_counter() - start) * 1000)
+
+            assert usage["messages"] == pairs + refreshes
+            timings.sort()
+            rows.append((size_mb, cold_ms, timings[len(timings) // 2], timings[-1]))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Incremental transcript usage parser")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    show = sub.add_parser("show", help="Print token aggregates for a transcript")
+    show.add_argument("transcript")
+    show.add_argument("--session-id")
+
+    bench = sub.add_parser("bench", help="Refresh latency vs transcript size")
+    bench.add_argument("--sizes-mb", default="1,10,50")
+    bench.add_argument("--refreshes", type=int, default=50)
+
+    args = parser.parse_args()
+
+    if args.command == "show":
+        usage = read_transcript_usage(args.transcript, args.session_id)
+        if usage is None:
+            print(f"Cannot read {args.transcript}", file=sys.stderr)
+            return 1
+        print(json.dumps(usage, indent=2))
+        return 0
+
+    sizes = [int(s) for s in args.sizes_mb.split(",") if s.strip()]
+    print(f"{'size MB':>8}  {'cold ms':>9}  {'refresh p50 ms':>15}  {'refresh max ms':>15}")
+    for size_mb, cold_ms, p50, worst in run_benchmark(sizes, args.refreshes):
+        print(f"{size_mb:>8}  {cold_ms:9.1f}  {p50:15.3f}  {worst:15.3f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())